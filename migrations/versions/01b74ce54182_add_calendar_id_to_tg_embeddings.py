@@ -0,0 +1,34 @@
+"""add calendar_id to tg_embeddings
+
+Revision ID: 01b74ce54182
+Revises: 30dd044f9146
+Create Date: 2026-10-18 12:26:09.318475
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "01b74ce54182"
+down_revision: Union[str, Sequence[str], None] = "30dd044f9146"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "tg_embeddings",
+        sa.Column(
+            "calendar_id",
+            sa.String(),
+            server_default="primary",
+            nullable=False,
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("tg_embeddings", "calendar_id")
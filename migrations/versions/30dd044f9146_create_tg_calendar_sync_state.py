@@ -0,0 +1,37 @@
+"""create tg_calendar_sync_state
+
+Revision ID: 30dd044f9146
+Revises: ccb82cf4e252
+Create Date: 2026-10-18 11:03:17.552901
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "30dd044f9146"
+down_revision: Union[str, Sequence[str], None] = "ccb82cf4e252"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "tg_calendar_sync_state",
+        sa.Column("user_id", sa.BigInteger(), primary_key=True),
+        sa.Column("calendar_id", sa.String(), primary_key=True),
+        sa.Column("sync_token", sa.Text(), nullable=True),
+        sa.Column(
+            "updated_at",
+            sa.TIMESTAMP(),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("tg_calendar_sync_state")
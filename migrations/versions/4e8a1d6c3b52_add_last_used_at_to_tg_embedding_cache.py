@@ -0,0 +1,40 @@
+"""add last_used_at to tg_embedding_cache
+
+Revision ID: 4e8a1d6c3b52
+Revises: c5d9e2a4b871
+Create Date: 2026-10-18 19:27:51.804316
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "4e8a1d6c3b52"
+down_revision: Union[str, Sequence[str], None] = "c5d9e2a4b871"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "tg_embedding_cache",
+        sa.Column(
+            "last_used_at",
+            sa.TIMESTAMP(),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+    )
+    op.create_index(
+        "ix_tg_embedding_cache_last_used_at",
+        "tg_embedding_cache",
+        ["last_used_at"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_tg_embedding_cache_last_used_at", table_name="tg_embedding_cache")
+    op.drop_column("tg_embedding_cache", "last_used_at")
@@ -0,0 +1,50 @@
+"""add hnsw index on message and (user_id, start_ts) index to tg_embeddings
+
+Revision ID: 5e2c1b7a9d40
+Revises: 01b74ce54182
+Create Date: 2026-10-18 13:02:47.551203
+
+"""
+
+import os
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5e2c1b7a9d40"
+down_revision: Union[str, Sequence[str], None] = "01b74ce54182"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+EMBEDDING_DIMENSIONS = int(os.getenv("EMBEDDING_DIMENSIONS", "1536"))
+
+
+def upgrade() -> None:
+    # load the version of the installed image, iterative index scans need 0.8+
+    op.execute("ALTER EXTENSION vector UPDATE")
+    # an HNSW index needs a column with a fixed number of dimensions
+    op.execute(
+        f"ALTER TABLE tg_embeddings "
+        f"ALTER COLUMN message TYPE vector({EMBEDDING_DIMENSIONS}) "
+        f"USING message::vector({EMBEDDING_DIMENSIONS})"
+    )
+    op.create_index(
+        "ix_tg_embeddings_message_hnsw",
+        "tg_embeddings",
+        ["message"],
+        postgresql_using="hnsw",
+        postgresql_with={"m": 16, "ef_construction": 64},
+        postgresql_ops={"message": "vector_l2_ops"},
+    )
+    op.create_index(
+        "ix_tg_embeddings_user_id_start_ts",
+        "tg_embeddings",
+        ["user_id", "start_ts"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_tg_embeddings_user_id_start_ts", table_name="tg_embeddings")
+    op.drop_index("ix_tg_embeddings_message_hnsw", table_name="tg_embeddings")
+    op.execute("ALTER TABLE tg_embeddings ALTER COLUMN message TYPE vector")
@@ -0,0 +1,26 @@
+"""add timezone to tg_users
+
+Revision ID: 7b2e4c9d1a35
+Revises: f3b8d2c61a94
+Create Date: 2026-10-18 18:04:12.519732
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "7b2e4c9d1a35"
+down_revision: Union[str, Sequence[str], None] = "f3b8d2c61a94"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("tg_users", sa.Column("timezone", sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("tg_users", "timezone")
@@ -0,0 +1,44 @@
+"""add generated search_vector with gin index to tg_embeddings
+
+Revision ID: b41f8e6d2a73
+Revises: 5e2c1b7a9d40
+Create Date: 2026-10-18 13:41:09.862114
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "b41f8e6d2a73"
+down_revision: Union[str, Sequence[str], None] = "5e2c1b7a9d40"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "tg_embeddings",
+        sa.Column(
+            "search_vector",
+            postgresql.TSVECTOR(),
+            sa.Computed(
+                "to_tsvector('russian', coalesce(combined_text, ''))",
+                persisted=True,
+            ),
+        ),
+    )
+    op.create_index(
+        "ix_tg_embeddings_search_vector",
+        "tg_embeddings",
+        ["search_vector"],
+        postgresql_using="gin",
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_tg_embeddings_search_vector", table_name="tg_embeddings")
+    op.drop_column("tg_embeddings", "search_vector")
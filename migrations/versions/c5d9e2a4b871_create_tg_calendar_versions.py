@@ -0,0 +1,38 @@
+"""create tg_calendar_versions
+
+Revision ID: c5d9e2a4b871
+Revises: 7b2e4c9d1a35
+Create Date: 2026-10-18 18:46:05.713264
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c5d9e2a4b871"
+down_revision: Union[str, Sequence[str], None] = "7b2e4c9d1a35"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "tg_calendar_versions",
+        sa.Column("user_id", sa.BigInteger(), primary_key=True),
+        sa.Column(
+            "version", sa.BigInteger(), server_default=sa.text("0"), nullable=False
+        ),
+        sa.Column(
+            "updated_at",
+            sa.TIMESTAMP(),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("tg_calendar_versions")
@@ -0,0 +1,50 @@
+"""add content_hash to tg_embeddings and tg_embedding_cache table
+
+Revision ID: ccb82cf4e252
+Revises: 96b5a5d7ae38
+Create Date: 2026-10-18 10:12:41.204518
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+from pgvector.sqlalchemy import Vector
+
+# revision identifiers, used by Alembic.
+revision: str = "ccb82cf4e252"
+down_revision: Union[str, Sequence[str], None] = "96b5a5d7ae38"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "tg_embeddings",
+        sa.Column("content_hash", sa.String(64), nullable=True),
+    )
+    # combined_text is exactly the embedded text, so existing rows can be backfilled
+    op.execute(
+        "UPDATE tg_embeddings "
+        "SET content_hash = encode(sha256(convert_to(combined_text, 'UTF8')), 'hex') "
+        "WHERE combined_text IS NOT NULL"
+    )
+
+    op.create_table(
+        "tg_embedding_cache",
+        sa.Column("model", sa.String(), primary_key=True),
+        sa.Column("text_hash", sa.String(64), primary_key=True),
+        sa.Column("message", Vector(), nullable=False),
+        sa.Column(
+            "created_at",
+            sa.TIMESTAMP(),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("tg_embedding_cache")
+    op.drop_column("tg_embeddings", "content_hash")
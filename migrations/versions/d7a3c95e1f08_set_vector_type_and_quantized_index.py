@@ -0,0 +1,90 @@
+"""store tg_embeddings.message with an explicit vector type and dimension
+
+Revision ID: d7a3c95e1f08
+Revises: b41f8e6d2a73
+Create Date: 2026-10-18 14:20:33.417026
+
+"""
+
+import os
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d7a3c95e1f08"
+down_revision: Union[str, Sequence[str], None] = "b41f8e6d2a73"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+EMBEDDING_DIMENSIONS = int(os.getenv("EMBEDDING_DIMENSIONS", "1536"))
+EMBEDDING_VECTOR_TYPE = os.getenv("EMBEDDING_VECTOR_TYPE", "vector")
+VECTOR_QUANTIZATION = os.getenv("VECTOR_QUANTIZATION", "none")
+
+
+def upgrade() -> None:
+    if EMBEDDING_VECTOR_TYPE not in ("vector", "halfvec"):
+        raise ValueError(f"Unsupported EMBEDDING_VECTOR_TYPE: {EMBEDDING_VECTOR_TYPE}")
+
+    # halfvec and binary_quantize need pgvector 0.7+
+    op.execute("ALTER EXTENSION vector UPDATE")
+    version = op.get_bind().scalar(
+        sa.text("SELECT extversion FROM pg_extension WHERE extname = 'vector'")
+    )
+    if tuple(int(part) for part in version.split(".")[:2]) < (0, 7) and (
+        EMBEDDING_VECTOR_TYPE == "halfvec" or VECTOR_QUANTIZATION == "binary"
+    ):
+        raise ValueError(
+            f"pgvector {version} is installed, halfvec and binary quantization "
+            f"need 0.7 or newer"
+        )
+
+    column_type = f"{EMBEDDING_VECTOR_TYPE}({EMBEDDING_DIMENSIONS})"
+
+    op.drop_index("ix_tg_embeddings_message_hnsw", table_name="tg_embeddings")
+    # vectors of another dimension can't be cast: drop them and the sync tokens
+    # of their owners, so that the next sync embeds their events again
+    mismatched = f"vector_dims(message) <> {EMBEDDING_DIMENSIONS}"
+    op.execute(
+        f"DELETE FROM tg_calendar_sync_state WHERE user_id IN "
+        f"(SELECT DISTINCT user_id FROM tg_embeddings WHERE {mismatched})"
+    )
+    op.execute(f"DELETE FROM tg_embeddings WHERE {mismatched}")
+    op.execute(
+        f"ALTER TABLE tg_embeddings "
+        f"ALTER COLUMN message TYPE {column_type} USING message::{column_type}"
+    )
+
+    if VECTOR_QUANTIZATION == "binary":
+        op.execute(
+            f"CREATE INDEX ix_tg_embeddings_message_hnsw ON tg_embeddings "
+            f"USING hnsw ((binary_quantize(message)::bit({EMBEDDING_DIMENSIONS})) "
+            f"bit_hamming_ops) WITH (m = 16, ef_construction = 64)"
+        )
+    else:
+        op.create_index(
+            "ix_tg_embeddings_message_hnsw",
+            "tg_embeddings",
+            ["message"],
+            postgresql_using="hnsw",
+            postgresql_with={"m": 16, "ef_construction": 64},
+            postgresql_ops={"message": f"{EMBEDDING_VECTOR_TYPE}_l2_ops"},
+        )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_tg_embeddings_message_hnsw", table_name="tg_embeddings")
+    op.execute(
+        f"ALTER TABLE tg_embeddings "
+        f"ALTER COLUMN message TYPE vector({EMBEDDING_DIMENSIONS}) "
+        f"USING message::vector({EMBEDDING_DIMENSIONS})"
+    )
+    op.create_index(
+        "ix_tg_embeddings_message_hnsw",
+        "tg_embeddings",
+        ["message"],
+        postgresql_using="hnsw",
+        postgresql_with={"m": 16, "ef_construction": 64},
+        postgresql_ops={"message": "vector_l2_ops"},
+    )
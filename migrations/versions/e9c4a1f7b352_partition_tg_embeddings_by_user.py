@@ -0,0 +1,135 @@
+"""partition tg_embeddings by user_id hash and add tg_embeddings_archive
+
+Revision ID: e9c4a1f7b352
+Revises: d7a3c95e1f08
+Create Date: 2026-10-18 15:36:52.108934
+
+"""
+
+import os
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e9c4a1f7b352"
+down_revision: Union[str, Sequence[str], None] = "d7a3c95e1f08"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+EMBEDDING_PARTITIONS = int(os.getenv("EMBEDDING_PARTITIONS", "16"))
+EMBEDDING_DIMENSIONS = int(os.getenv("EMBEDDING_DIMENSIONS", "1536"))
+EMBEDDING_VECTOR_TYPE = os.getenv("EMBEDDING_VECTOR_TYPE", "vector")
+VECTOR_QUANTIZATION = os.getenv("VECTOR_QUANTIZATION", "none")
+
+# every column except the generated search_vector
+COLUMNS = (
+    "id, event_id, calendar_id, participants, combined_text, content_hash, "
+    "updated_at, message, location, end_ts, start_ts, user_id, updated, "
+    "organizer_email, organizer_display_name"
+)
+INDEXES = [
+    "ix_tg_embeddings_message_hnsw",
+    "ix_tg_embeddings_user_id_start_ts",
+    "ix_tg_embeddings_search_vector",
+]
+
+
+def upgrade() -> None:
+    op.execute("DELETE FROM tg_embeddings WHERE user_id IS NULL")
+    replace_table(
+        partition_by="PARTITION BY HASH (user_id)",
+        primary_key="id, user_id",
+    )
+    for remainder in range(EMBEDDING_PARTITIONS):
+        op.execute(
+            f"CREATE TABLE tg_embeddings_p{remainder} PARTITION OF tg_embeddings "
+            f"FOR VALUES WITH (MODULUS {EMBEDDING_PARTITIONS}, REMAINDER {remainder})"
+        )
+    copy_rows_and_index()
+
+    op.create_table(
+        "tg_embeddings_archive",
+        sa.Column("id", sa.String(), primary_key=True),
+        sa.Column("user_id", sa.BigInteger(), primary_key=True),
+        sa.Column("calendar_id", sa.String(), nullable=False),
+        sa.Column("event_id", sa.String(), nullable=True),
+        sa.Column("combined_text", sa.Text(), nullable=True),
+        sa.Column("location", sa.Text(), nullable=True),
+        sa.Column("start_ts", sa.TIMESTAMP(), nullable=True),
+        sa.Column("end_ts", sa.TIMESTAMP(), nullable=True),
+        sa.Column(
+            "archived_at",
+            sa.TIMESTAMP(),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("tg_embeddings_archive")
+    replace_table(partition_by="", primary_key="id")
+    copy_rows_and_index()
+
+
+def replace_table(partition_by: str, primary_key: str):
+    """
+    Rename tg_embeddings away and create an empty table of the same shape.
+    """
+    for index in INDEXES:
+        op.drop_index(index, table_name="tg_embeddings")
+    op.execute("ALTER TABLE tg_embeddings RENAME TO tg_embeddings_old")
+    op.execute(
+        "ALTER TABLE tg_embeddings_old "
+        "RENAME CONSTRAINT tg_embeddings_pkey TO tg_embeddings_old_pkey"
+    )
+    op.execute(
+        f"CREATE TABLE tg_embeddings "
+        f"(LIKE tg_embeddings_old INCLUDING DEFAULTS INCLUDING GENERATED) "
+        f"{partition_by}"
+    )
+    op.execute("ALTER TABLE tg_embeddings ALTER COLUMN user_id SET NOT NULL")
+    op.execute(
+        f"ALTER TABLE tg_embeddings "
+        f"ADD CONSTRAINT tg_embeddings_pkey PRIMARY KEY ({primary_key})"
+    )
+
+
+def copy_rows_and_index():
+    """
+    Move the rows from the renamed table and build the indexes once afterwards.
+    """
+    op.execute(
+        f"INSERT INTO tg_embeddings ({COLUMNS}) "
+        f"SELECT {COLUMNS} FROM tg_embeddings_old"
+    )
+    op.execute("DROP TABLE tg_embeddings_old")
+
+    if VECTOR_QUANTIZATION == "binary":
+        op.execute(
+            f"CREATE INDEX ix_tg_embeddings_message_hnsw ON tg_embeddings "
+            f"USING hnsw ((binary_quantize(message)::bit({EMBEDDING_DIMENSIONS})) "
+            f"bit_hamming_ops) WITH (m = 16, ef_construction = 64)"
+        )
+    else:
+        op.create_index(
+            "ix_tg_embeddings_message_hnsw",
+            "tg_embeddings",
+            ["message"],
+            postgresql_using="hnsw",
+            postgresql_with={"m": 16, "ef_construction": 64},
+            postgresql_ops={"message": f"{EMBEDDING_VECTOR_TYPE}_l2_ops"},
+        )
+    op.create_index(
+        "ix_tg_embeddings_user_id_start_ts",
+        "tg_embeddings",
+        ["user_id", "start_ts"],
+    )
+    op.create_index(
+        "ix_tg_embeddings_search_vector",
+        "tg_embeddings",
+        ["search_vector"],
+        postgresql_using="gin",
+    )
@@ -0,0 +1,29 @@
+"""add window_end to tg_calendar_sync_state
+
+Revision ID: f3b8d2c61a94
+Revises: e9c4a1f7b352
+Create Date: 2026-10-18 17:12:40.381206
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "f3b8d2c61a94"
+down_revision: Union[str, Sequence[str], None] = "e9c4a1f7b352"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "tg_calendar_sync_state",
+        sa.Column("window_end", sa.TIMESTAMP(), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("tg_calendar_sync_state", "window_end")
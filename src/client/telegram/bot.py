@@ -3,13 +3,16 @@ import os
 import telebot
 from telebot import types
 
+from client.telegram.progress import ProgressReporter
+from client.telegram.streaming import ReplyStreamer
 from rag.service import answer_with_rag
 from shared.helper import get_message
 from shared.storage.users_repo import create_user, get_user
 from sources.google_calendar.google_auth import build_auth_url
-from sources.google_calendar.google_calendar import load_all_events
+from sources.google_calendar.google_calendar import load_all_events, sync_flights
 
 TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
+STREAM_ANSWERS = os.getenv("STREAM_ANSWERS", "true").lower() == "true"
 
 bot = telebot.TeleBot(TELEGRAM_BOT_TOKEN)
 
@@ -81,7 +84,8 @@ def sync_button_handler(message):
     message back to the user. If synchronization fails, an explanatory error
     message is returned.
 
-    Show progress of calendar loading in percents.
+    Show progress of calendar loading in percents. If a sync of the same user
+    is already running, the handler waits for it and reports its result.
 
     Args:
         message (telebot.types.Message): The incoming Telegram message generated when the user presses
@@ -93,20 +97,18 @@ def sync_button_handler(message):
 
     status_msg = bot.send_message(
         chat_id,
-        "Синхронизация календаря… ⏳",
+        (
+            "Синхронизация уже идёт, дождусь её результата… ⏳"
+            if sync_flights.in_flight(user_id)
+            else "Синхронизация календаря… ⏳"
+        ),
     )
 
     try:
-
-        def on_step(current, total):
-            percent = int(current / total * 100)
-            bot.edit_message_text(
-                chat_id=chat_id,
-                message_id=status_msg.message_id,
-                text=f"Синхронизация календаря… {percent}%",
+        with ProgressReporter(bot, chat_id, status_msg.message_id) as on_step:
+            inserted, updated, deleted = load_all_events(
+                user, progress_callback=on_step
             )
-
-        inserted, updated, deleted = load_all_events(user, progress_callback=on_step)
         bot.send_message(
             chat_id,
             get_message(inserted, updated, deleted),
@@ -132,7 +134,8 @@ def process_message(message: telebot.types.Message):
 
     This function passes the user's message into the retrieval-augmented
     generation pipeline to produce a reply, then sends that reply back
-    to the user.
+    to the user. With `STREAM_ANSWERS` enabled, the reply is shown while it
+    is generated by editing a single message.
 
     Args:
         message (telebot.types.Message): The Telegram message object containing the text sent by the user
@@ -142,17 +145,16 @@ def process_message(message: telebot.types.Message):
     user_id = message.from_user.id
 
     user = get_user(user_id)
+    streamer = ReplyStreamer(bot, message.chat.id, get_sync_bottom_menu())
     try:
-        reply = answer_with_rag(user, user_text)
+        with streamer:
+            reply = answer_with_rag(
+                user, user_text, on_delta=streamer if STREAM_ANSWERS else None
+            )
     except Exception as e:
         print("RAG error:", repr(e))
         reply = "У меня сейчас проблемы с доступом к данным. Попробуй ещё раз позже 🛠️"
-    bot.send_message(
-        message.chat.id,
-        reply,
-        parse_mode="Markdown",
-        reply_markup=get_sync_bottom_menu(),
-    )
+    streamer.finish(reply)
 
 
 def get_sync_bottom_menu(is_login: bool = False) -> types.ReplyKeyboardMarkup:
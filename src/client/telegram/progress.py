@@ -0,0 +1,72 @@
+import os
+from threading import Event, Lock, Thread
+
+import telebot
+
+PROGRESS_INTERVAL_SECONDS = float(os.getenv("SYNC_PROGRESS_INTERVAL_SECONDS", "2"))
+
+
+class ProgressReporter:
+    """
+    Show sync progress by editing one Telegram message, off the sync's hot path.
+
+    Calling the reporter only records the latest progress, so the sync thread
+    never waits for the Telegram API. A background thread edits the message at
+    most once per `interval` seconds, and only when the rounded percentage has
+    grown since the last edit. The shown percentage never goes back, so
+    progress should be reported against a total that does not grow, see
+    `sync_user_calendars`. Use it as a context manager: on exit the last
+    recorded percentage is shown and the thread stops.
+    """
+
+    def __init__(
+        self,
+        bot: telebot.TeleBot,
+        chat_id: int,
+        message_id: int,
+        text: str = "Синхронизация календаря… {percent}%",
+        interval: float = PROGRESS_INTERVAL_SECONDS,
+    ):
+        self._bot = bot
+        self._chat_id = chat_id
+        self._message_id = message_id
+        self._text = text
+        self._interval = interval
+
+        self._lock = Lock()
+        self._percent = 0
+        self._shown_percent = 0
+        self._stopped = Event()
+        self._thread = Thread(target=self._run, daemon=True)
+
+    def __enter__(self) -> "ProgressReporter":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stopped.set()
+        self._thread.join()
+
+    def __call__(self, current: int, total: int):
+        percent = min(int(current / (total or 1) * 100), 100)
+        with self._lock:
+            self._percent = max(self._percent, percent)
+
+    def _run(self):
+        while not self._stopped.wait(self._interval):
+            self._flush()
+        self._flush()
+
+    def _flush(self):
+        with self._lock:
+            percent = self._percent
+        if percent > self._shown_percent:
+            try:
+                self._bot.edit_message_text(
+                    chat_id=self._chat_id,
+                    message_id=self._message_id,
+                    text=self._text.format(percent=percent),
+                )
+                self._shown_percent = percent
+            except Exception as e:
+                print("Progress update error:", repr(e))
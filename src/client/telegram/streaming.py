@@ -0,0 +1,131 @@
+import os
+from threading import Event, Lock, Thread
+
+import telebot
+from telebot.util import smart_split
+
+STREAM_EDIT_INTERVAL_SECONDS = float(os.getenv("STREAM_EDIT_INTERVAL_SECONDS", "1"))
+MESSAGE_LIMIT = 4096
+
+
+class ReplyStreamer:
+    """
+    Show an answer while it is generated by editing one Telegram message.
+
+    Calling the streamer with a piece of text only appends it to a buffer, so
+    the thread reading the model's stream never waits for the Telegram API. A
+    background thread sends the message with the first text and then edits it
+    at most once per `interval` seconds, only when the text has changed. The
+    partial text is shown without formatting, since an unfinished answer may
+    have unbalanced Markdown.
+
+    Use it as a context manager and call `finish` with the complete answer
+    after leaving it.
+    """
+
+    def __init__(
+        self,
+        bot: telebot.TeleBot,
+        chat_id: int,
+        reply_markup=None,
+        interval: float = STREAM_EDIT_INTERVAL_SECONDS,
+    ):
+        self._bot = bot
+        self._chat_id = chat_id
+        self._reply_markup = reply_markup
+        self._interval = interval
+
+        self._lock = Lock()
+        self._parts: list[str] = []
+        self._shown_text = ""
+        self._message_id = None
+        self._stopped = Event()
+        self._thread = Thread(target=self._run, daemon=True)
+
+    def __enter__(self) -> "ReplyStreamer":
+        try:
+            self._bot.send_chat_action(self._chat_id, "typing")
+        except Exception as e:
+            print("Chat action error:", repr(e))
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stopped.set()
+        self._thread.join()
+
+    def __call__(self, delta: str):
+        with self._lock:
+            self._parts.append(delta)
+
+    def finish(self, text: str, parse_mode: str = "Markdown"):
+        """
+        Replace the streamed text with the complete, formatted answer.
+
+        Text beyond Telegram's message limit is sent as further messages. If
+        the answer cannot be parsed with `parse_mode`, it is shown as plain text.
+
+        Args:
+            text (str): The complete answer.
+            parse_mode (str): The Telegram parse mode of the answer.
+        """
+        first, *rest = smart_split(text, MESSAGE_LIMIT) or [text]
+        if self._message_id is None:
+            self._send(first, parse_mode)
+        else:
+            self._edit(first, parse_mode)
+        for chunk in rest:
+            self._send(chunk, parse_mode)
+
+    def _run(self):
+        while not self._stopped.wait(self._interval):
+            self._flush()
+
+    def _flush(self):
+        with self._lock:
+            text = "".join(self._parts)[:MESSAGE_LIMIT]
+        if not text.strip() or text == self._shown_text:
+            return
+        try:
+            if self._message_id is None:
+                message = self._bot.send_message(
+                    self._chat_id, text, reply_markup=self._reply_markup
+                )
+                self._message_id = message.message_id
+            else:
+                self._bot.edit_message_text(
+                    text, chat_id=self._chat_id, message_id=self._message_id
+                )
+            self._shown_text = text
+        except Exception as e:
+            print("Stream update error:", repr(e))
+
+    def _send(self, text: str, parse_mode: str):
+        try:
+            message = self._bot.send_message(
+                self._chat_id,
+                text,
+                parse_mode=parse_mode,
+                reply_markup=self._reply_markup,
+            )
+        except telebot.apihelper.ApiTelegramException:
+            message = self._bot.send_message(
+                self._chat_id, text, reply_markup=self._reply_markup
+            )
+        if self._message_id is None:
+            self._message_id = message.message_id
+
+    def _edit(self, text: str, parse_mode: str):
+        for mode in (parse_mode, None):
+            try:
+                self._bot.edit_message_text(
+                    text,
+                    chat_id=self._chat_id,
+                    message_id=self._message_id,
+                    parse_mode=mode,
+                )
+                return
+            except telebot.apihelper.ApiTelegramException as e:
+                if "message is not modified" in str(e):
+                    return
+                print("Stream update error:", repr(e))
@@ -0,0 +1,48 @@
+"""
+Measure the fixed per-sync cost of preparing the Google Calendar client.
+
+Before: every `fetch_events` call ran `build("calendar", "v3", credentials=...)`,
+which parses the discovery document and creates a fresh HTTP transport.
+After: the service is built once per process and transports are pooled per user.
+
+No network requests are made, so the numbers exclude the TCP/TLS handshakes
+saved by connection reuse. Run from `src/`:
+
+    python -m experiment.calendar_client_benchmark
+"""
+
+import timeit
+from types import SimpleNamespace
+
+from google.oauth2.credentials import Credentials
+from googleapiclient.discovery import build
+
+from sources.google_calendar.client import authorized_http, get_service
+
+ITERATIONS = 50
+
+user = SimpleNamespace(
+    id=1,
+    google_access_token="token",
+    google_refresh_token="refresh",
+    token_expiry=None,
+)
+creds = Credentials(token="token")
+
+
+def before():
+    service = build("calendar", "v3", credentials=creds)
+    service.events().list(calendarId="primary")
+
+
+def after():
+    service = get_service()
+    with authorized_http(user):
+        service.events().list(calendarId="primary")
+
+
+if __name__ == "__main__":
+    for name, fn in [("before", before), ("after", after)]:
+        fn()
+        seconds = timeit.timeit(fn, number=ITERATIONS) / ITERATIONS
+        print(f"{name:>6}: {seconds * 1000:.2f} ms per sync")
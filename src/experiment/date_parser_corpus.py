@@ -0,0 +1,71 @@
+"""
+Check the local relative-date parser against the rules of `date_tool`.
+
+The questions below are resolved relative to the day of the tool's own
+examples (2026-01-20, a Tuesday) unless another day is given; None means the
+parser must leave the question to the chat model. Run from `src/`:
+
+    python -m experiment.date_parser_corpus
+"""
+
+import sys
+from datetime import date
+
+from shared.nlp.relative_dates import parse_date_range
+
+TODAY = date(2026, 1, 20)
+
+CASES = [
+    ("Что сегодня?", TODAY, (date(2026, 1, 20), date(2026, 1, 20))),
+    ("что у меня завтра?", TODAY, (date(2026, 1, 21), date(2026, 1, 21))),
+    ("А что было вчера", TODAY, (date(2026, 1, 19), date(2026, 1, 19))),
+    ("Что через неделю?", TODAY, (date(2026, 1, 27), date(2026, 1, 27))),
+    ("Что на этой неделе?", TODAY, (date(2026, 1, 19), date(2026, 1, 25))),
+    (
+        "Какие встречи на следующей неделе?",
+        TODAY,
+        (date(2026, 1, 26), date(2026, 2, 1)),
+    ),
+    ("Что было на прошлой неделе?", TODAY, (date(2026, 1, 12), date(2026, 1, 18))),
+    ("Что в этом месяце?", TODAY, (date(2026, 1, 1), date(2026, 1, 31))),
+    ("Планы в следующем месяце", TODAY, (date(2026, 2, 1), date(2026, 2, 28))),
+    ("Что было в прошлом месяце?", TODAY, (date(2025, 12, 1), date(2025, 12, 31))),
+    ("Что в пятницу?", TODAY, (date(2026, 1, 23), date(2026, 1, 23))),
+    ("Что в понедельник?", TODAY, (date(2026, 1, 26), date(2026, 1, 26))),
+    ("Есть встречи в среду?", TODAY, (date(2026, 1, 21), date(2026, 1, 21))),
+    ("Что в следующую пятницу?", TODAY, (date(2026, 1, 30), date(2026, 1, 30))),
+    ("Что было в прошлую пятницу?", TODAY, (date(2026, 1, 16), date(2026, 1, 16))),
+    ("Во сколько завтрашний созвон?", TODAY, (date(2026, 1, 21), date(2026, 1, 21))),
+    ("Где встреча завтра в 10?", TODAY, (date(2026, 1, 21), date(2026, 1, 21))),
+    ("Что в воскресенье?", date(2026, 1, 25), None),
+    ("Что в субботу?", date(2026, 1, 25), (date(2026, 1, 31), date(2026, 1, 31))),
+    ("В следующем месяце", date(2026, 12, 15), (date(2027, 1, 1), date(2027, 1, 31))),
+    ("Что во вторник?", TODAY, None),
+    ("Когда завтрак?", TODAY, None),
+    ("Что у меня 25.01?", TODAY, None),
+    ("Что завтра и в пятницу?", TODAY, None),
+    ("Что на выходных?", TODAY, None),
+    ("Что через 3 дня?", TODAY, None),
+    ("Есть ли среди встреч обед?", TODAY, None),
+    ("Когда встреча с Антоном?", TODAY, None),
+    ("Что у меня в марте?", TODAY, None),
+    ("что у меня до пятницы?", TODAY, None),
+    ("К пятнице нужно подготовить отчёт?", TODAY, None),
+    ("Что до конца недели?", TODAY, None),
+    ("Что с понедельника по среду?", TODAY, None),
+    ("Что запланировано с завтра?", TODAY, None),
+    ("Что кроме пятницы?", TODAY, None),
+    ("Когда встреча с Антоном завтра?", TODAY, (date(2026, 1, 21), date(2026, 1, 21))),
+]
+
+
+if __name__ == "__main__":
+    failures = 0
+    for question, today, expected in CASES:
+        actual = parse_date_range(question, today)
+        if actual != expected:
+            failures += 1
+            print(f"FAIL {question!r} ({today}): expected {expected}, got {actual}")
+
+    print(f"{len(CASES) - failures}/{len(CASES)} questions resolved as expected")
+    sys.exit(1 if failures else 0)
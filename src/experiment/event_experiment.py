@@ -48,7 +48,7 @@ def fake_embed_fn(_query: str):
     return [0.0, 0.1, 0.2]
 
 
-def fake_search_fn(_user, _query_embedding, top_k: int = 5):
+def fake_search_fn(_user, _query_embedding, top_k: int = 5, query: str | None = None):
     return rows
 
 
@@ -63,6 +63,9 @@ def target(inputs: dict) -> dict:
         user_query=inputs["question"],
         embed_fn=fake_embed_fn,
         search_fn=fake_search_fn,
+        cache=None,
+        agenda_fn=None,
+        date_range_fn=None,
     )
     return {"answer": answer or ""}
 
@@ -0,0 +1,93 @@
+"""
+Measure how much compact vector storage costs in retrieval quality.
+
+The stored vectors of one user are ranked exactly in float32 and with each
+compact option, and recall@k is the share of the exact top-k that the option
+returns as well:
+
+- halfvec: components rounded to float16 (`EMBEDDING_VECTOR_TYPE=halfvec`);
+- binary xN: Hamming-distance candidates re-ranked exactly, N candidates per
+  result (`VECTOR_QUANTIZATION=binary`, `VECTOR_RERANK_FACTOR=N`);
+- dims D: the first D components renormalized, which is what the embedding
+  API returns for text-embedding-3 models with `dimensions=D`.
+
+Each event is used as a query against all the other events of the user. Run
+from `src/`:
+
+    python -m experiment.vector_recall_benchmark <user_id> [top_k]
+"""
+
+import sys
+from types import SimpleNamespace
+
+import numpy as np
+
+from shared.storage.embeddings_repo import get_user_vectors
+
+MAX_QUERIES = 200
+RERANK_FACTORS = [1, 2, 4, 8]
+REDUCED_DIMENSIONS = [1024, 512, 256]
+
+
+def normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1, norms)
+
+
+def top_k(scores: np.ndarray, k: int) -> set[int]:
+    return set(np.argsort(-scores)[:k].tolist())
+
+
+def recall(exact: list[set[int]], approx: list[set[int]]) -> float:
+    return np.mean([len(e & a) / len(e) for e, a in zip(exact, approx)])
+
+
+def search_exact(matrix, query, exclude, k):
+    scores = matrix @ query
+    scores[exclude] = -np.inf
+    return top_k(scores, k)
+
+
+def search_binary(matrix, bits, query, exclude, k, factor):
+    query_bits = query > 0
+    hamming = (bits != query_bits).sum(axis=1).astype(np.float32)
+    hamming[exclude] = np.inf
+    candidates = np.argsort(hamming)[: k * factor]
+    scores = matrix[candidates] @ query
+    return {int(candidates[i]) for i in np.argsort(-scores)[:k]}
+
+
+if __name__ == "__main__":
+    user = SimpleNamespace(id=int(sys.argv[1]))
+    k = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    vectors = [np.asarray(row[-1], dtype=np.float32) for row in get_user_vectors(user)]
+    if len(vectors) <= k:
+        sys.exit(f"User {user.id} has too few events: {len(vectors)}")
+
+    matrix = normalize(np.vstack(vectors))
+    queries = range(min(len(vectors), MAX_QUERIES))
+    exact = [search_exact(matrix, matrix[q], q, k) for q in queries]
+
+    results = {}
+
+    half = normalize(matrix.astype(np.float16).astype(np.float32))
+    results["halfvec"] = [search_exact(half, half[q], q, k) for q in queries]
+
+    bits = matrix > 0
+    for factor in RERANK_FACTORS:
+        results[f"binary x{factor}"] = [
+            search_binary(matrix, bits, matrix[q], q, k, factor) for q in queries
+        ]
+
+    for dims in REDUCED_DIMENSIONS:
+        if dims >= matrix.shape[1]:
+            continue
+        reduced = normalize(matrix[:, :dims])
+        results[f"dims {dims}"] = [
+            search_exact(reduced, reduced[q], q, k) for q in queries
+        ]
+
+    print(f"user {user.id}: {len(vectors)} events, {len(queries)} queries, k={k}")
+    for name, approx in results.items():
+        print(f"{name:>12}: recall@{k} = {recall(exact, approx):.3f}")
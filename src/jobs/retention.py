@@ -0,0 +1,74 @@
+"""
+Remove events that ended long ago from tg_embeddings.
+
+Syncs only keep events from now on, but rows of users who stop syncing stay
+forever. This job deletes events that ended more than `RETENTION_DAYS` ago,
+or moves them to `tg_embeddings_archive` with `RETENTION_ARCHIVE=true`.
+Cached vectors in `tg_embedding_cache` that no sync has reused for
+`EMBEDDING_CACHE_RETENTION_DAYS` are deleted as well.
+`main` runs it every `RETENTION_INTERVAL_HOURS`; run it once from `src/` with:
+
+    python -m jobs.retention
+"""
+
+import os
+import time
+from datetime import datetime, timedelta, timezone
+
+from shared.storage.agenda_index import agenda_indexes, to_stored_time
+from shared.storage.calendar_version_repo import bump_calendar_versions
+from shared.storage.embedding_cache_repo import remove_unused_cached_vectors
+from shared.storage.embeddings_repo import remove_past_events
+from shared.storage.vector_index import vector_indexes
+
+RETENTION_DAYS = int(os.getenv("RETENTION_DAYS", "30"))
+RETENTION_ARCHIVE = os.getenv("RETENTION_ARCHIVE", "false").lower() == "true"
+RETENTION_INTERVAL_HOURS = float(os.getenv("RETENTION_INTERVAL_HOURS", "24"))
+EMBEDDING_CACHE_RETENTION_DAYS = int(os.getenv("EMBEDDING_CACHE_RETENTION_DAYS", "30"))
+
+
+def run_retention() -> int:
+    """
+    Remove the events that ended before the retention horizon once.
+
+    Return:
+        int: The number of removed events.
+    """
+    # naive UTC, like the stored end times
+    before = to_stored_time(datetime.now(timezone.utc)) - timedelta(days=RETENTION_DAYS)
+    removed = remove_past_events(before, archive=RETENTION_ARCHIVE)
+    for user_id in removed:
+        vector_indexes.invalidate(user_id)
+        agenda_indexes.invalidate(user_id)
+    bump_calendar_versions(removed)
+
+    total = sum(removed.values())
+    print(
+        f"Retention: {'archived' if RETENTION_ARCHIVE else 'deleted'} {total} "
+        f"events of {len(removed)} users that ended before {before:%Y-%m-%d}"
+    )
+
+    cached = remove_unused_cached_vectors(
+        timedelta(days=EMBEDDING_CACHE_RETENTION_DAYS)
+    )
+    print(
+        f"Retention: deleted {cached} cached vectors unused for "
+        f"{EMBEDDING_CACHE_RETENTION_DAYS} days"
+    )
+    return total
+
+
+def run_retention_forever():
+    """
+    Run the retention job every `RETENTION_INTERVAL_HOURS`, logging failures.
+    """
+    while True:
+        try:
+            run_retention()
+        except Exception as e:
+            print("Retention error:", repr(e))
+        time.sleep(RETENTION_INTERVAL_HOURS * 3600)
+
+
+if __name__ == "__main__":
+    run_retention()
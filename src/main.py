@@ -3,12 +3,14 @@ from threading import Thread
 import uvicorn
 
 from client.telegram.bot import run
+from jobs.retention import run_retention_forever
 from server.server import app
 
 
 def main():
     bot_thread = Thread(target=run, daemon=True)
     bot_thread.start()
+    Thread(target=run_retention_forever, daemon=True).start()
     uvicorn.run(app, host="0.0.0.0", port=8020)
 
 
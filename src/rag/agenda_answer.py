@@ -0,0 +1,189 @@
+import re
+import time
+from datetime import date, datetime, timedelta, tzinfo
+from threading import Lock
+
+from rag.open_ai_client import WEEKDAY_RU
+from shared.models.user import TgUser
+from shared.nlp.relative_dates import split_date_range
+from shared.storage.agenda_index import local_times, search_agenda_days
+from shared.storage.embeddings_repo import RetrievedEvent
+from shared.storage.users_repo import user_timezone
+
+MONTHS_RU = [
+    "января",
+    "февраля",
+    "марта",
+    "апреля",
+    "мая",
+    "июня",
+    "июля",
+    "августа",
+    "сентября",
+    "октября",
+    "ноября",
+    "декабря",
+]
+
+# words that may surround the period in a question that only asks for the agenda
+AGENDA_WORDS = frozenset(
+    """
+    а в во и на у что какие какой какая мне меня мои моё мое мой есть ли там
+    было будет будут запланировано запланированы запланированного
+    планы план планах планов встречи встреча встреч события событие событий
+    мероприятия дела расписание календарь календаре покажи подскажи скажи
+    пожалуйста
+    """.split()
+)
+
+
+class AnswerPathMetrics:
+    """
+    Counts how many questions are answered from a template instead of the model.
+    """
+
+    def __init__(self):
+        self.answers = 0
+        self.fast_path = 0
+        self.fast_path_seconds = 0.0
+        self._lock = Lock()
+
+    def record(self, fast_path: bool, seconds: float = 0.0):
+        with self._lock:
+            self.answers += 1
+            if fast_path:
+                self.fast_path += 1
+                self.fast_path_seconds += seconds
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "answers": self.answers,
+                "fast_path": self.fast_path,
+                "fast_path_share": (
+                    self.fast_path / self.answers if self.answers else 0.0
+                ),
+                "fast_path_avg_ms": (
+                    self.fast_path_seconds / self.fast_path * 1000
+                    if self.fast_path
+                    else 0.0
+                ),
+            }
+
+
+answer_path_metrics = AnswerPathMetrics()
+
+
+def match_agenda_query(
+    text: str, today: date | None = None
+) -> tuple[date, date] | None:
+    """
+    Recognise a question that only asks what is planned for a period.
+
+    The period must be resolved by `split_date_range`, and every other word of
+    the question must be one of `AGENDA_WORDS`, e.g. "что сегодня?" or "есть
+    ли встречи в пятницу?". Questions about anything else, such as a time, a
+    place or a person, are not matched.
+
+    Args:
+        text (str): The user's question.
+        today (date | None): The date the question is relative to; today by default.
+
+    Return:
+        tuple[date, date] | None: The first and the last day of the period,
+            or None if the question is not a plain agenda lookup.
+    """
+    period, rest = split_date_range(text, today)
+    if period is None or not set(re.findall(r"\w+", rest)) <= AGENDA_WORDS:
+        return None
+    return period
+
+
+def answer_agenda_query(user: TgUser, text: str) -> str | None:
+    """
+    Answer a plain agenda lookup from the user's events without the chat model.
+
+    The period and the event times are resolved in the user's time zone, see
+    `user_timezone`. Every call is counted in `answer_path_metrics`, so the
+    share of questions answered this way can be monitored.
+
+    Args:
+        user (TgUser): The Telegram user who asked the question.
+        text (str): The user's question.
+
+    Return:
+        str | None: The agenda of the period, or None if the question needs
+            the full RAG pipeline.
+    """
+    started = time.perf_counter()
+    zone = user_timezone(user)
+    period = match_agenda_query(text, datetime.now(zone).date())
+    if period is None:
+        answer_path_metrics.record(fast_path=False)
+        return None
+
+    start, end = period
+    reply = render_agenda(start, end, search_agenda_days(user, start, end), zone)
+    answer_path_metrics.record(fast_path=True, seconds=time.perf_counter() - started)
+    return reply
+
+
+def render_agenda(
+    start: date, end: date, events: list[RetrievedEvent], zone: tzinfo
+) -> str:
+    """
+    Render the events of a period as a reply, grouped by day for longer periods.
+
+    Args:
+        start (date): The first day of the period.
+        end (date): The last day of the period.
+        events (list[RetrievedEvent]): The events of the period, earliest first.
+        zone (tzinfo): The time zone the events are shown in.
+
+    Return:
+        str: The reply text.
+    """
+    if start == end:
+        header = format_day(start)
+    else:
+        header = f"{format_short_day(start)} – {format_short_day(end)}"
+
+    if not events:
+        return f"📅 {header}: ничего не запланировано."
+
+    lines = [f"📅 {header}:"]
+    day = None
+    for event in events:
+        event_start, event_end = local_times(event, zone)
+        if start != end and event_start.date() != day:
+            day = event_start.date()
+            lines.append(f"\n{format_day(day)}")
+        lines.append(format_event(event, event_start, event_end))
+    return "\n".join(lines)
+
+
+def format_day(day: date) -> str:
+    return f"{WEEKDAY_RU[day.weekday()].capitalize()}, {format_short_day(day)}"
+
+
+def format_short_day(day: date) -> str:
+    return f"{day.day} {MONTHS_RU[day.month - 1]}"
+
+
+def format_event(event: RetrievedEvent, start: datetime, end: datetime | None) -> str:
+    title = (event.combined_text or "").split(" | ", 1)[0] or "Без названия"
+    details = []
+    if event.location:
+        details.append(f"📍 {event.location}")
+    if event.organizer_display_name:
+        details.append(f"👤 {event.organizer_display_name}")
+    line = f"• {format_time(start, end)} — {title}"
+    return f"{line} ({', '.join(details)})" if details else line
+
+
+def format_time(start: datetime, end: datetime | None) -> str:
+    if end and start.time() == end.time() == datetime.min.time():
+        return "весь день" if end - start <= timedelta(days=1) else "несколько дней"
+    if end and end.date() == start.date():
+        return f"{start:%H:%M}–{end:%H:%M}"
+    return f"{start:%H:%M}"
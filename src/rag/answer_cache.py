@@ -0,0 +1,154 @@
+import os
+import time
+from collections import OrderedDict
+from datetime import date
+from threading import Lock
+from typing import NamedTuple
+
+import numpy as np
+from pgvector import Vector
+
+ANSWER_CACHE_MAX_USERS = int(os.getenv("ANSWER_CACHE_MAX_USERS", "1024"))
+ANSWER_CACHE_PER_USER = int(os.getenv("ANSWER_CACHE_PER_USER", "16"))
+ANSWER_CACHE_TTL_SECONDS = float(os.getenv("ANSWER_CACHE_TTL_SECONDS", "300"))
+ANSWER_CACHE_SIMILARITY = float(os.getenv("ANSWER_CACHE_SIMILARITY", "0.95"))
+
+
+class CachedAnswer(NamedTuple):
+    expires_at: float
+    version: int
+    date_range: tuple[date, date] | None
+    embedding: np.ndarray
+    answer: str
+
+
+class SemanticAnswerCache:
+    """
+    Recent answers of each user, found again by the similarity of the question.
+
+    A cached answer is served for a question whose normalized embedding has a
+    cosine similarity of at least `threshold` with the cached question, whose
+    resolved date range is the same, and only while the user's calendar
+    version is the one the answer was computed from. Answers expire after
+    `ttl_seconds`; at most `per_user` answers are kept for each of the
+    `max_users` most recently active users, evicting the least recently used.
+    """
+
+    def __init__(
+        self,
+        max_users: int = ANSWER_CACHE_MAX_USERS,
+        per_user: int = ANSWER_CACHE_PER_USER,
+        ttl_seconds: float = ANSWER_CACHE_TTL_SECONDS,
+        threshold: float = ANSWER_CACHE_SIMILARITY,
+    ):
+        self.max_users = max_users
+        self.per_user = per_user
+        self.ttl_seconds = ttl_seconds
+        self.threshold = threshold
+        self.hits = 0
+        self.misses = 0
+        self._answers: OrderedDict[int, list[CachedAnswer]] = OrderedDict()
+        self._lock = Lock()
+
+    def get(
+        self,
+        user_id: int,
+        version: int,
+        embedding: Vector,
+        date_range: tuple[date, date] | None,
+    ) -> str | None:
+        """
+        Return the cached answer of the most similar question, if any is close enough.
+
+        Args:
+            user_id (int): The Telegram user ID.
+            version (int): The user's current calendar version.
+            embedding (Vector): The embedding of the question.
+            date_range (tuple[date, date] | None): The period the question
+                is about, see `parse_date_range`.
+
+        Return:
+            str | None: The cached answer, or None on a miss.
+        """
+        query = normalize(embedding)
+        now = time.monotonic()
+        with self._lock:
+            answers = [
+                cached
+                for cached in self._answers.get(user_id, [])
+                if cached.expires_at > now and cached.version == version
+            ]
+            if answers:
+                self._answers[user_id] = answers
+                self._answers.move_to_end(user_id)
+            else:
+                self._answers.pop(user_id, None)
+
+            best, best_score = None, self.threshold
+            for cached in answers:
+                if cached.date_range != date_range:
+                    continue
+                score = float(cached.embedding @ query)
+                if score >= best_score:
+                    best, best_score = cached, score
+
+            if best is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return best.answer
+
+    def put(
+        self,
+        user_id: int,
+        version: int,
+        embedding: Vector,
+        date_range: tuple[date, date] | None,
+        answer: str,
+    ):
+        """
+        Cache an answer computed from the given calendar version.
+
+        Args:
+            user_id (int): The Telegram user ID.
+            version (int): The calendar version read before the answer was computed.
+            embedding (Vector): The embedding of the question.
+            date_range (tuple[date, date] | None): The period the question is about.
+            answer (str): The answer to cache.
+        """
+        cached = CachedAnswer(
+            time.monotonic() + self.ttl_seconds,
+            version,
+            date_range,
+            normalize(embedding),
+            answer,
+        )
+        with self._lock:
+            answers = self._answers.setdefault(user_id, [])
+            answers.append(cached)
+            del answers[: -self.per_user]
+            self._answers.move_to_end(user_id)
+            while len(self._answers) > self.max_users:
+                self._answers.popitem(last=False)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "users": len(self._answers),
+                "size": sum(len(answers) for answers in self._answers.values()),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+def normalize(embedding: Vector) -> np.ndarray:
+    vector = np.asarray(
+        embedding.to_numpy() if isinstance(embedding, Vector) else embedding,
+        dtype=np.float32,
+    )
+    return vector / (np.linalg.norm(vector) or 1)
+
+
+answer_cache = SemanticAnswerCache()
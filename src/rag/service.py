@@ -1,24 +1,42 @@
 import json
-from datetime import datetime
+import os
+from datetime import date, datetime
+from typing import Callable
 
 from langsmith import traceable
-from openai.types.chat import ChatCompletionMessageFunctionToolCall
+from openai.types.chat import (
+    ChatCompletionMessage,
+    ChatCompletionMessageFunctionToolCall,
+)
+from openai.types.chat.chat_completion_message_function_tool_call import Function
 
+from rag.agenda_answer import answer_agenda_query
+from rag.answer_cache import SemanticAnswerCache, answer_cache
 from rag.open_ai_client import CHAT_MODEL, openai_client, system_prompt
 from rag.tools.company_info_tool import company_info_tool
 from rag.tools.date_tool import date_tool
 from rag.tools.location_tool import location_tool
-from shared.models.embedding import Embedding
+from rag.tools.registry import ToolRegistry
 from shared.models.user import TgUser
 from shared.nlp.embeddings import embed_query
-from shared.storage.embeddings_repo import (
-    search_events_by_date_range,
-    search_similar_embeddings,
-)
+from shared.nlp.relative_dates import mentions_date, parse_date_range
+from shared.storage.agenda_index import search_agenda_days
+from shared.storage.calendar_version_repo import get_calendar_version
+from shared.storage.embeddings_repo import RetrievedEvent, search_hybrid
+from shared.storage.users_repo import user_timezone
+from shared.storage.vector_index import search_in_memory
 from sources.web_search.client import enrich_company_info, enrich_event_by_location
 
+RAG_SEARCH_BACKEND = os.getenv("RAG_SEARCH_BACKEND", "postgres")
+DEFAULT_SEARCH_FN = (
+    search_in_memory if RAG_SEARCH_BACKEND == "memory" else search_hybrid
+)
+TOOL_CALL_MAX_DEPTH = int(os.getenv("TOOL_CALL_MAX_DEPTH", "3"))
+
+tool_registry = ToolRegistry()
+
 
-def build_context(records: list[Embedding]) -> str:
+def build_context(records: list[RetrievedEvent]) -> str:
     """
     Build a textual context from a list of calendar embeddings.
 
@@ -27,7 +45,7 @@ def build_context(records: list[Embedding]) -> str:
     then joins them into a single context block.
 
     Args:
-        records (list[Embedding]): A list of embedding records representing calendar events.
+        records (list[RetrievedEvent]): A list of retrieved records representing calendar events.
 
     Return:
         str: A formatted context string built from the records, or a fallback
@@ -45,206 +63,245 @@ def answer_with_rag(
     user: TgUser,
     user_query: str,
     embed_fn=embed_query,
-    search_fn=search_similar_embeddings,
-    top_k=5,
+    search_fn=DEFAULT_SEARCH_FN,
+    top_k=3,
+    on_delta: Callable[[str], None] | None = None,
+    cache: SemanticAnswerCache | None = answer_cache,
+    agenda_fn: Callable[[TgUser, str], str | None] | None = answer_agenda_query,
+    date_range_fn: (
+        Callable[[str, date], tuple[date, date] | None] | None
+    ) = parse_date_range,
 ) -> str | None:
     """
     Generate an answer using a retrieval-augmented generation (RAG) pipeline.
 
-    This function embeds the user's query, searches for similar calendar
+    This function embeds the user's query, searches for matching calendar
     embeddings, builds a context from them, and calls the chat model with
-    optional tool usage. If a location-related tool is invoked, the response
-    is further enriched with location information.
+    optional tool usage. All tool calls of a model turn are executed
+    concurrently and answered with a single follow-up completion, for up to
+    `TOOL_CALL_MAX_DEPTH` turns; after that the model has to answer without tools.
+
+    If the question names a relative period that `parse_date_range` resolves
+    locally, such as "завтра" or "на следующей неделе", the events of that
+    period are used as the context instead of the similarity search, and the
+    model is not offered `date_tool`, which saves a completion. Questions
+    that only ask for the agenda of such a period are answered from a
+    template without the model, see `answer_agenda_query`.
+
+    Answers are cached per user: a question similar enough to a recent one,
+    about the same period and asked before the user's calendar changed, gets
+    the cached answer without calling the model, see `SemanticAnswerCache`.
+    Questions that mention a date or a number that was not resolved locally
+    are never cached, since similar embeddings do not mean the same date.
 
     Args:
         user (TgUser): The Telegram user object whose data and embeddings are used.
         user_query (str): The original text query submitted by the user.
         top_k (int): The maximum number of similar embeddings to retrieve for context.
+        on_delta (Callable[[str], None] | None): If given, every completion is
+            streamed and each piece of answer text is passed to it as soon as
+            it arrives, including the answer after a tool call.
+        cache (SemanticAnswerCache | None): The answer cache, or None to
+            always compute the answer.
+        agenda_fn (Callable | None): Answers plain agenda lookups without the
+            model, or None to always use the model.
+        date_range_fn (Callable | None): Resolves the period of the question
+            locally, or None to always use `search_fn` and leave dates to
+            `date_tool`.
 
     Return:
         str: The final answer generated by the chat model, or None if
             no answer could be produced.
     """
-    query_embedding = embed_fn(user_query)
-    rows = search_fn(user, query_embedding, top_k=top_k)
-
-    context = build_context(rows)
+    if agenda_fn is not None:
+        reply = agenda_fn(user, user_query)
+        if reply is not None:
+            return reply
+
+    # read before any events are loaded: an answer computed while a sync runs
+    # is cached under the version the sync replaces, so it is never served
+    version = get_calendar_version(user.id)
+    date_range = None
+    if date_range_fn is not None:
+        date_range = date_range_fn(user_query, datetime.now(user_timezone(user)).date())
+    # a date the question names but that was not resolved locally would be
+    # lost in the embedding, e.g. "15 марта" and "16 марта" are near-duplicates
+    if date_range is None and mentions_date(user_query):
+        cache = None
+    query_embedding = None
+    if cache is not None or date_range is None:
+        query_embedding = embed_fn(user_query)
+    if cache is not None:
+        reply = cache.get(user.id, version, query_embedding, date_range)
+        if reply is not None:
+            return reply
+
+    if date_range:
+        start, end = date_range
+        context = (
+            f"Контекст событий пользователя с {start} по {end}:\n"
+            f"{build_context(search_agenda_days(user, start, end))}"
+        )
+        tools = [tool for tool in tool_registry.definitions if tool is not date_tool]
+    else:
+        rows = search_fn(user, query_embedding, top_k=top_k, query=user_query)
+        context = f"Контекст событий пользователя:\n{build_context(rows)}"
+        tools = tool_registry.definitions
 
     messages = [
         {"role": "system", "content": system_prompt},
-        {"role": "assistant", "content": f"Контекст событий пользователя:\n{context}"},
+        {"role": "assistant", "content": context},
         {"role": "user", "content": user_query},
     ]
 
-    completion = openai_client.chat.completions.create(
-        model=CHAT_MODEL,
-        messages=messages,
-        tools=[location_tool, company_info_tool, date_tool],
-        tool_choice="auto",
-    )
-
-    answer = completion.choices[0].message
-    messages.append(answer)
-
-    if answer.tool_calls:
-        for tool_call in answer.tool_calls:
-            fn_name = tool_call.function.name
-            if fn_name == "enrich_event_by_location":
-                return answer_with_location_info(tool_call, messages)
-            if fn_name == "enrich_company_info":
-                return answer_with_company_info(tool_call, messages)
-            if fn_name == "date_tool":
-                return answer_with_date_tool(user, tool_call, messages)
-    else:
-        return answer.content
+    reply = complete_with_tools(user, messages, tools, on_delta)
+    if cache is not None and reply:
+        cache.put(user.id, version, query_embedding, date_range, reply)
+    return reply
 
 
-@traceable(run_type="llm")
-def answer_with_location_info(
-    tool_call: ChatCompletionMessageFunctionToolCall, messages: [dict]
-) -> str:
+def complete_with_tools(
+    user: TgUser,
+    messages: list[dict],
+    tools: list[dict],
+    on_delta: Callable[[str], None] | None = None,
+) -> str | None:
     """
-    Handle a location tool call and enrich the answer with location-based information.
-
-    This function parses the tool call arguments to extract the location,
-    fetches additional data for that location, appends the tool result to
-    the messages, and then calls the chat model again to generate a final,
-    location-aware answer.
+    Let the chat model answer, running the tools it asks for in between.
 
     Args:
-        tool_call (ChatCompletionMessage): The tool call message containing the
-            function name and JSON arguments from the model.
-        messages (list[dict]): The list of chat messages representing the current
-            conversation state, including system, user, assistant, and tool turns.
+        user (TgUser): The Telegram user the tools run for.
+        messages (list[dict]): The conversation so far; model and tool turns
+            are appended to it.
+        tools (list[dict]): The definitions of the tools offered to the model.
+        on_delta (Callable[[str], None] | None): Receives the answer text as it is streamed.
 
     Return:
-        str: The final answer text generated by the chat model after incorporating
-            the location enrichment result.
+        str | None: The final answer of the model.
     """
-    args = json.loads(tool_call.function.arguments)
-    location = args["location"]
-
-    tool_result = enrich_event_by_location(location=location)
-    messages.append(
-        {
-            "role": "tool",
-            "tool_call_id": tool_call.id,
-            "name": "enrich_event_by_location",
-            "content": json.dumps(tool_result, ensure_ascii=False),
-        }
-    )
-
-    final = openai_client.chat.completions.create(
-        model=CHAT_MODEL,
-        messages=messages,
-    )
+    for _ in range(TOOL_CALL_MAX_DEPTH):
+        answer = complete(messages, on_delta, tools=tools, tool_choice="auto")
+        messages.append(answer)
+        if not answer.tool_calls:
+            return answer.content
+        messages.extend(tool_registry.run(user, answer.tool_calls))
 
-    return final.choices[0].message.content
+    return complete(messages, on_delta, tools=tools, tool_choice="none").content
 
 
-@traceable(run_type="llm")
-def answer_with_company_info(
-    tool_call: ChatCompletionMessageFunctionToolCall,
+def complete(
     messages: list[dict],
-) -> str:
+    on_delta: Callable[[str], None] | None = None,
+    **kwargs,
+) -> ChatCompletionMessage:
     """
-    Handle a company info tool call and generate a final model response.
+    Call the chat model and return its message, streaming it if requested.
 
-    This function:
-        1. Parses the tool call arguments to extract the company name.
-        2. Calls `enrich_company_info` to fetch additional company information.
-        3. Appends the tool result to the conversation messages.
-        4. Performs a follow-up model call to produce the final user-facing answer.
+    With `on_delta`, the completion is requested with `stream=True`: pieces of
+    the answer text are passed to `on_delta` as they arrive, and tool calls are
+    assembled from their streamed fragments, so the result looks the same as
+    without streaming.
 
     Args:
-        tool_call (ChatCompletionMessageFunctionToolCall):
-            The tool call message containing the function name and JSON arguments.
-        messages (list[dict]):
-            The current conversation message history including system, user,
-            assistant, and tool messages.
+        messages (list[dict]): The conversation to complete.
+        on_delta (Callable[[str], None] | None): Receives each piece of answer text.
+        **kwargs: Further arguments of `chat.completions.create`, e.g. `tools`.
 
     Return:
-        str: The final response text generated by the model after incorporating
-                the enriched company information.
+        ChatCompletionMessage: The assistant message with its content and tool calls.
     """
-    args = json.loads(tool_call.function.arguments or "{}")
-
-    company_name = args.get("company_name")
-
-    tool_result = enrich_company_info(
-        company_name=company_name,
+    if on_delta is None:
+        completion = openai_client.chat.completions.create(
+            model=CHAT_MODEL, messages=messages, **kwargs
+        )
+        return completion.choices[0].message
+
+    stream = openai_client.chat.completions.create(
+        model=CHAT_MODEL, messages=messages, stream=True, **kwargs
     )
-    messages.append(
-        {
-            "role": "tool",
-            "tool_call_id": tool_call.id,
-            "name": "enrich_company_info",
-            "content": json.dumps(tool_result, ensure_ascii=False),
-        }
+    content = []
+    tool_calls: dict[int, dict] = {}
+    for chunk in stream:
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta
+
+        if delta.content:
+            content.append(delta.content)
+            on_delta(delta.content)
+
+        for fragment in delta.tool_calls or []:
+            call = tool_calls.setdefault(
+                fragment.index, {"id": None, "name": "", "arguments": ""}
+            )
+            call["id"] = fragment.id or call["id"]
+            if fragment.function:
+                call["name"] += fragment.function.name or ""
+                call["arguments"] += fragment.function.arguments or ""
+
+    return ChatCompletionMessage(
+        role="assistant",
+        content="".join(content) or None,
+        tool_calls=[
+            ChatCompletionMessageFunctionToolCall(
+                id=call["id"],
+                type="function",
+                function=Function(name=call["name"], arguments=call["arguments"]),
+            )
+            for _, call in sorted(tool_calls.items())
+        ]
+        or None,
     )
 
-    final = openai_client.chat.completions.create(
-        model=CHAT_MODEL,
-        messages=messages,
-    )
 
-    return final.choices[0].message.content
+@tool_registry.register(location_tool)
+@traceable(run_type="tool")
+def location_info(user: TgUser, args: dict) -> str:
+    """
+    Fetch additional information about an event location.
 
+    Args:
+        user (TgUser): The Telegram user who asked the question.
+        args (dict): The tool call arguments with the `location` string.
 
-def answer_with_date_tool(
-    user: TgUser,
-    tool_call: ChatCompletionMessageFunctionToolCall,
-    messages: list[dict],
-):
+    Return:
+        str: The location information as JSON, used as the tool message content.
     """
-    Handle a date tool call and enrich the answer with calendar events for the
-    requested date range.
+    tool_result = enrich_event_by_location(location=args["location"])
+    return json.dumps(tool_result, ensure_ascii=False)
 
-    This function parses the tool call arguments to extract `start_date` and
-    `end_date`, converts them into concrete datetime boundaries, fetches the
-    user's calendar events for that range, appends the tool result to the
-    message stack, and then calls the chat model again to generate a final,
-    context-aware answer.
+
+@tool_registry.register(company_info_tool)
+@traceable(run_type="tool")
+def company_info(user: TgUser, args: dict) -> str:
+    """
+    Fetch additional information about a company.
 
     Args:
-        user (TgUser):
-            The Telegram user whose calendar data should be queried.
-        tool_call (ChatCompletionMessageFunctionToolCall):
-            The tool call message containing the function name and JSON arguments
-            emitted by the model (`start_date` and `end_date`).
-        messages (list[dict]):
-            The list of chat messages representing the current conversation state,
-            including system, user, assistant, and previous tool turns.
-
-    Returns:
-        str:
-            The final answer generated by the chat model after incorporating
-            calendar data returned by this tool.
+        user (TgUser): The Telegram user who asked the question.
+        args (dict): The tool call arguments with the `company_name`.
+
+    Return:
+        str: The company information as JSON, used as the tool message content.
     """
-    args = json.loads(tool_call.function.arguments)
-    start_date = args["start_date"]
-    end_date = args["end_date"]
-    start_dt = datetime.fromisoformat(start_date).replace(
-        hour=0, minute=0, second=0, microsecond=0
-    )
-    end_dt = datetime.fromisoformat(end_date).replace(
-        hour=23, minute=59, second=59, microsecond=999_999
-    )
+    tool_result = enrich_company_info(company_name=args.get("company_name"))
+    return json.dumps(tool_result, ensure_ascii=False)
 
-    tool_result = search_events_by_date_range(user, start_dt, end_dt)
 
-    messages.append(
-        {
-            "role": "tool",
-            "tool_call_id": tool_call.id,
-            "name": "date_tool",
-            "content": build_context(tool_result),
-        }
-    )
+@tool_registry.register(date_tool)
+@traceable(run_type="tool")
+def date_range_events(user: TgUser, args: dict) -> str:
+    """
+    Fetch the user's calendar events for the requested date range.
 
-    final = openai_client.chat.completions.create(
-        model=CHAT_MODEL,
-        messages=messages,
-    )
+    Args:
+        user (TgUser): The Telegram user whose calendar data should be queried.
+        args (dict): The tool call arguments with `start_date` and `end_date`
+            in YYYY-MM-DD format.
 
-    return final.choices[0].message.content
+    Return:
+        str: The events of the range formatted as context for the chat model.
+    """
+    start_date = datetime.fromisoformat(args["start_date"]).date()
+    end_date = datetime.fromisoformat(args["end_date"]).date()
+    return build_context(search_agenda_days(user, start_date, end_date))
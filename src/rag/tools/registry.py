@@ -0,0 +1,100 @@
+import contextvars
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+from openai.types.chat import ChatCompletionMessageFunctionToolCall
+
+from shared.models.user import TgUser
+
+TOOL_CALL_WORKERS = int(os.getenv("TOOL_CALL_WORKERS", "4"))
+
+ToolHandler = Callable[[TgUser, dict], str]
+
+
+class ToolRegistry:
+    """
+    Tools offered to the chat model and the handlers that execute them.
+
+    Handlers take the user and the parsed arguments of a call and return the
+    content of the tool message. All calls of one model turn run concurrently
+    on a bounded thread pool shared by every request.
+    """
+
+    def __init__(self, max_workers: int = TOOL_CALL_WORKERS):
+        self._definitions: list[dict] = []
+        self._handlers: dict[str, ToolHandler] = {}
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="rag-tool"
+        )
+
+    @property
+    def definitions(self) -> list[dict]:
+        return list(self._definitions)
+
+    def register(self, definition: dict) -> Callable[[ToolHandler], ToolHandler]:
+        """
+        Register a handler for the tool described by `definition`.
+
+        Args:
+            definition (dict): The tool definition sent to the chat model.
+
+        Return:
+            Callable[[ToolHandler], ToolHandler]: A decorator registering the handler.
+        """
+
+        def decorator(handler: ToolHandler) -> ToolHandler:
+            self._definitions.append(definition)
+            self._handlers[definition["function"]["name"]] = handler
+            return handler
+
+        return decorator
+
+    def run(
+        self,
+        user: TgUser,
+        tool_calls: list[ChatCompletionMessageFunctionToolCall],
+    ) -> list[dict]:
+        """
+        Execute the tool calls concurrently and return their tool messages.
+
+        A call that fails, or names an unknown tool, gets an error message
+        instead of a result, so the model can still answer with the rest.
+
+        Args:
+            user (TgUser): The Telegram user the tools run for.
+            tool_calls (list[ChatCompletionMessageFunctionToolCall]): The calls
+                requested by the model in one turn.
+
+        Return:
+            list[dict]: One tool message per call, in the order of the calls.
+        """
+        futures = [
+            self._executor.submit(
+                contextvars.copy_context().run, self._run_one, user, tool_call
+            )
+            for tool_call in tool_calls
+        ]
+        return [
+            {
+                "role": "tool",
+                "tool_call_id": tool_call.id,
+                "name": tool_call.function.name,
+                "content": future.result(),
+            }
+            for tool_call, future in zip(tool_calls, futures)
+        ]
+
+    def _run_one(
+        self, user: TgUser, tool_call: ChatCompletionMessageFunctionToolCall
+    ) -> str:
+        name = tool_call.function.name
+        try:
+            handler = self._handlers.get(name)
+            if handler is None:
+                raise ValueError(f"Unknown tool: {name}")
+            return handler(user, json.loads(tool_call.function.arguments or "{}"))
+        except Exception as e:
+            print(f"Tool {name} error:", repr(e))
+            return json.dumps({"error": str(e)}, ensure_ascii=False)
@@ -1,7 +1,14 @@
 from fastapi import FastAPI, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import HTMLResponse
 
-from shared.storage.users_repo import get_user, save_tokens
+from rag.agenda_answer import answer_path_metrics
+from rag.answer_cache import answer_cache
+from shared.storage.async_db import async_pool_metrics
+from shared.storage.async_users_repo import get_user, save_tokens
+from shared.storage.pool_metrics import pool_metrics
+from shared.storage.users_repo import user_cache
+from sources.google_calendar.credentials_manager import credentials_manager
 from sources.google_calendar.google_auth import exchange_code_for_tokens
 
 app = FastAPI()
@@ -22,6 +29,54 @@ def read_root() -> dict:
     return {"status": "ok", "message": "FastAPI works!"}
 
 
+@app.get("/metrics/db-pool")
+def db_pool_metrics() -> dict:
+    """
+    Return the usage counters of the database connection pools.
+
+    Return:
+        dict: Counters of the sync and async pools, see `PoolMetrics`.
+    """
+    return {
+        "sync": pool_metrics.snapshot(),
+        "async": async_pool_metrics.snapshot(),
+    }
+
+
+@app.get("/metrics/user-cache")
+def user_cache_metrics() -> dict:
+    """
+    Return the hit and miss counters of the user cache.
+
+    Return:
+        dict: The cache size, hits, misses and hit rate.
+    """
+    return user_cache.snapshot()
+
+
+@app.get("/metrics/answers")
+def answer_metrics() -> dict:
+    """
+    Return how many answers were rendered from a template without the chat model.
+
+    Return:
+        dict: The number of answers, the fast-path count and share, and the
+            average fast-path latency in milliseconds.
+    """
+    return answer_path_metrics.snapshot()
+
+
+@app.get("/metrics/answer-cache")
+def answer_cache_metrics() -> dict:
+    """
+    Return the hit and miss counters of the semantic answer cache.
+
+    Return:
+        dict: The number of cached users and answers, hits, misses and hit rate.
+    """
+    return answer_cache.snapshot()
+
+
 @app.get("/google/oauth2callback", response_class=HTMLResponse)
 async def google_oauth_callback(request: Request) -> HTMLResponse:
     """
@@ -56,13 +111,14 @@ async def google_oauth_callback(request: Request) -> HTMLResponse:
     except ValueError:
         raise HTTPException(status_code=400, detail="Incorrect 'state'")
 
-    user = get_user(user_id)
+    user = await get_user(user_id)
 
     if user is None:
         raise HTTPException(status_code=404, detail="No user")
 
-    creds = exchange_code_for_tokens(code=code, state=state)
-    save_tokens(user_id, creds.token, creds.refresh_token, creds.expiry)
+    creds = await run_in_threadpool(exchange_code_for_tokens, code=code, state=state)
+    await save_tokens(user_id, creds.token, creds.refresh_token, creds.expiry)
+    credentials_manager.invalidate(user_id)
 
     return HTMLResponse(
         "Authentication success. Go to Telegram app and use /sync",
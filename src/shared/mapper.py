@@ -6,7 +6,7 @@ from pgvector import Vector
 from shared.models.calendar_event import CalendarEvent
 from shared.models.embedding import Embedding
 from shared.models.user import TgUser
-from shared.nlp.embeddings import embed_calendar_event
+from shared.nlp.embeddings import embed_texts, text_hash
 
 
 def map_date_time(timestamp: dict) -> date | None:
@@ -48,11 +48,14 @@ def map_event_to_embedding(
         Embedding: A fully constructed Embedding object containing event metadata
             and its semantic vector.
     """
+    combined_text = event.to_str()
     return Embedding(
-        id=event.event_id + str(user.id),
+        id=map_embedding_id(user, event),
         event_id=event.event_id,
+        calendar_id=event.calendar,
         participants=event.participants,
-        combined_text=event.to_str(),
+        combined_text=combined_text,
+        content_hash=text_hash(combined_text),
         updated_at=datetime.now(),
         message=vec,
         location=event.location,
@@ -65,16 +68,40 @@ def map_event_to_embedding(
     )
 
 
+def map_embedding_id(user: TgUser, event: CalendarEvent) -> str:
+    """
+    Build the primary key of an event's embedding row.
+
+    The same event can show up in several calendars of a user (e.g. an
+    invitation in both the primary and a team calendar), so events of
+    secondary calendars get the calendar ID appended. Primary calendar rows
+    keep the original `<event_id><user_id>` format.
+
+    Args:
+        user (TgUser): The Telegram user who owns the event.
+        event (CalendarEvent): The calendar event.
+
+    Return:
+        str: The embedding row ID.
+    """
+    if event.calendar == "primary":
+        return event.event_id + str(user.id)
+    return f"{event.event_id}{user.id}:{event.calendar}"
+
+
 def map_events(
-    user: TgUser, events: [CalendarEvent], progress_callback=None
+    user: TgUser,
+    events: [CalendarEvent],
+    progress_callback=None,
+    known_vectors: dict[str, Vector] | None = None,
 ) -> List[Embedding]:
-    total = len(events) or 1
-
     """
     Convert multiple calendar events into embedding objects.
 
-    This function iterates through a collection of calendar events, embeds each one,
-    and returns a list of Embedding model instances.
+    This function embeds the events with batched requests to the embedding model
+    and returns a list of Embedding model instances in the same order. Events
+    whose text is already present in `known_vectors` (or repeated within the
+    batch) are not sent to the embedding model again.
 
     Args:
         user (TgUser): The Telegram user to whom the events belong.
@@ -93,16 +120,45 @@ def map_events(
             This can be used to update a loading indicator in a Telegram bot
             (for example, showing percentage of completion). If None, progress
             updates are not reported.
+        known_vectors (dict[str, Vector], optional): Already computed vectors
+            keyed by the content hash of their text. Matching events reuse them.
 
     Return:
-        List[Embedding]: A list of embedding objects representing the provided events.
+        List[Embedding]: A list of embedding objects representing the provided
+            events. Events the embedding model rejects are left out.
     """
-    embeddings: List[Embedding] = []
-    for idx, event in enumerate(events, start=1):
-        embedding = map_event_to_embedding(user, event, embed_calendar_event(event))
-        embeddings.append(embedding)
+    vectors = dict(known_vectors or {})
+    total = len(events) or 1
+
+    texts_to_embed: dict[str, str] = {}
+    for event in events:
+        text = event.to_str()
+        digest = text_hash(text)
+        if digest not in vectors:
+            texts_to_embed[digest] = text
 
-        if progress_callback:
-            progress_callback(idx, total)
+    reused = len(events) - len(texts_to_embed)
+    if progress_callback and reused:
+        progress_callback(reused, total)
+
+    def on_step(current: int, _total: int):
+        progress_callback(reused + current, total)
+
+    embedded = embed_texts(
+        list(texts_to_embed.values()),
+        progress_callback=on_step if progress_callback else None,
+    )
+    vectors.update(
+        (digest, vector)
+        for digest, vector in zip(texts_to_embed.keys(), embedded)
+        if vector is not None
+    )
 
-    return embeddings
+    rows = []
+    for event in events:
+        vector = vectors.get(text_hash(event.to_str()))
+        if vector is None:
+            print(f"Event {event.event_id} could not be embedded, skipping it")
+            continue
+        rows.append(map_event_to_embedding(user, event, vector))
+    return rows
@@ -1,4 +1,15 @@
+from .calendar_sync_state import CalendarSyncState
+from .calendar_version import CalendarVersion
 from .embedding import Embedding
+from .embedding_archive import EmbeddingArchive
+from .embedding_cache import EmbeddingCache
 from .user import TgUser
 
-__all__ = ["TgUser", "Embedding"]
+__all__ = [
+    "TgUser",
+    "Embedding",
+    "EmbeddingArchive",
+    "EmbeddingCache",
+    "CalendarSyncState",
+    "CalendarVersion",
+]
@@ -23,6 +23,7 @@ class CalendarEvent:
     end_ts: dict
     updated: datetime
     organizer: Organizer
+    cancelled: bool = False
 
     def to_str(self) -> str:
         parts: List[str] = []
@@ -0,0 +1,15 @@
+from sqlalchemy import TIMESTAMP, BigInteger, Column, String, Text, func
+
+from shared.storage.db import Base
+
+
+class CalendarSyncState(Base):
+    __tablename__ = "tg_calendar_sync_state"
+
+    user_id = Column(BigInteger, primary_key=True)
+    calendar_id = Column(String, primary_key=True)
+
+    sync_token = Column(Text, nullable=True)
+    # end of the sync window the token was obtained for
+    window_end = Column(TIMESTAMP(), nullable=True)
+    updated_at = Column(TIMESTAMP(), server_default=func.now(), onupdate=func.now())
@@ -0,0 +1,13 @@
+from sqlalchemy import TIMESTAMP, BigInteger, Column, func, text
+
+from shared.storage.db import Base
+
+
+class CalendarVersion(Base):
+    __tablename__ = "tg_calendar_versions"
+
+    user_id = Column(BigInteger, primary_key=True)
+
+    # incremented whenever the user's stored events change
+    version = Column(BigInteger, nullable=False, server_default=text("0"))
+    updated_at = Column(TIMESTAMP(), server_default=func.now(), onupdate=func.now())
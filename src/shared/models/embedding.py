@@ -1,23 +1,120 @@
-from pgvector.sqlalchemy import VECTOR
-from sqlalchemy import ARRAY, TIMESTAMP, BigInteger, Column, String, Text
+import os
+
+import numpy as np
+from pgvector.sqlalchemy import HALFVEC, VECTOR
+from sqlalchemy import (
+    ARRAY,
+    TIMESTAMP,
+    BigInteger,
+    Column,
+    Computed,
+    Index,
+    String,
+    Text,
+    TypeDecorator,
+    text,
+)
+from sqlalchemy.dialects.postgresql import TSVECTOR
 
 from shared.storage.db import Base
 
+EMBEDDING_DIMENSIONS = int(os.getenv("EMBEDDING_DIMENSIONS", "1536"))
+# "vector" (float32) or "halfvec" (float16)
+EMBEDDING_VECTOR_TYPE = os.getenv("EMBEDDING_VECTOR_TYPE", "vector")
+# "none" or "binary": index binary-quantized vectors, re-rank with the stored ones
+VECTOR_QUANTIZATION = os.getenv("VECTOR_QUANTIZATION", "none")
+
+
+class EmbeddingVector(TypeDecorator):
+    """
+    A `vector` or `halfvec` column that reads and writes float32 NumPy arrays.
+
+    Values of either storage type look the same to the rest of the code, so
+    switching `EMBEDDING_VECTOR_TYPE` needs no changes outside the schema.
+    """
+
+    impl = VECTOR
+    cache_ok = True
+
+    def __init__(self, vector_type: str = "vector", dim: int | None = None):
+        super().__init__()
+        self.vector_type = vector_type
+        self.dim = dim
+        self.impl = (HALFVEC if vector_type == "halfvec" else VECTOR)(dim)
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        if hasattr(value, "to_numpy"):
+            value = value.to_numpy()
+        return np.asarray(value, dtype=np.float32)
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        if hasattr(value, "to_numpy"):
+            value = value.to_numpy()
+        return np.asarray(value, dtype=np.float32)
+
+
+def message_index() -> Index:
+    """
+    Build the HNSW index that serves nearest-neighbour search on `message`.
+
+    Return:
+        Index: An index on the binary-quantized vectors if `VECTOR_QUANTIZATION`
+            is "binary", otherwise on the stored vectors.
+    """
+    if VECTOR_QUANTIZATION == "binary":
+        return Index(
+            "ix_tg_embeddings_message_hnsw",
+            text(
+                f"(binary_quantize(message)::bit({EMBEDDING_DIMENSIONS})) "
+                f"bit_hamming_ops"
+            ),
+            postgresql_using="hnsw",
+            postgresql_with={"m": 16, "ef_construction": 64},
+        )
+    return Index(
+        "ix_tg_embeddings_message_hnsw",
+        "message",
+        postgresql_using="hnsw",
+        postgresql_with={"m": 16, "ef_construction": 64},
+        postgresql_ops={"message": f"{EMBEDDING_VECTOR_TYPE}_l2_ops"},
+    )
+
 
 class Embedding(Base):
     __tablename__ = "tg_embeddings"
+    __table_args__ = (
+        message_index(),
+        Index("ix_tg_embeddings_user_id_start_ts", "user_id", "start_ts"),
+        Index(
+            "ix_tg_embeddings_search_vector",
+            "search_vector",
+            postgresql_using="gin",
+        ),
+        # EMBEDDING_PARTITIONS partitions, created by the migration
+        {"postgresql_partition_by": "HASH (user_id)"},
+    )
 
     id = Column(String, primary_key=True)
 
     event_id = Column(String)
+    calendar_id = Column(String, nullable=False, default="primary")
     participants = Column(ARRAY(String))
     combined_text = Column(Text)
+    search_vector = Column(
+        TSVECTOR,
+        Computed("to_tsvector('russian', coalesce(combined_text, ''))", persisted=True),
+    )
+    content_hash = Column(String(64), nullable=True)
     updated_at = Column(TIMESTAMP())
-    message = Column(VECTOR)
+    message = Column(EmbeddingVector(EMBEDDING_VECTOR_TYPE, EMBEDDING_DIMENSIONS))
     location = Column(Text, nullable=True)
     end_ts = Column(TIMESTAMP(), nullable=True)
     start_ts = Column(TIMESTAMP(), nullable=True)
-    user_id = Column(BigInteger)
+    user_id = Column(BigInteger, primary_key=True)
     updated = Column(TIMESTAMP(timezone=True), nullable=True)
     organizer_email = Column(String, nullable=True)
     organizer_display_name = Column(String, nullable=True)
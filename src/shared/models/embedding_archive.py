@@ -0,0 +1,18 @@
+from sqlalchemy import TIMESTAMP, BigInteger, Column, String, Text, func
+
+from shared.storage.db import Base
+
+
+class EmbeddingArchive(Base):
+    __tablename__ = "tg_embeddings_archive"
+
+    id = Column(String, primary_key=True)
+    user_id = Column(BigInteger, primary_key=True)
+
+    calendar_id = Column(String, nullable=False)
+    event_id = Column(String)
+    combined_text = Column(Text)
+    location = Column(Text, nullable=True)
+    start_ts = Column(TIMESTAMP(), nullable=True)
+    end_ts = Column(TIMESTAMP(), nullable=True)
+    archived_at = Column(TIMESTAMP(), server_default=func.now())
@@ -0,0 +1,18 @@
+from pgvector.sqlalchemy import VECTOR
+from sqlalchemy import TIMESTAMP, Column, String, func
+
+from shared.storage.db import Base
+
+
+class EmbeddingCache(Base):
+    __tablename__ = "tg_embedding_cache"
+
+    model = Column(String, primary_key=True)
+    text_hash = Column(String(64), primary_key=True)
+
+    message = Column(VECTOR, nullable=False)
+    created_at = Column(TIMESTAMP(), server_default=func.now())
+    # refreshed at most daily when a sync reuses the vector, see `get_cached_vectors`
+    last_used_at = Column(
+        TIMESTAMP(), server_default=func.now(), nullable=False, index=True
+    )
@@ -16,5 +16,8 @@ class TgUser(Base):
     google_refresh_token = Column(Text)
     token_expiry = Column(TIMESTAMP())
 
+    # IANA name of the time zone of the user's primary calendar
+    timezone = Column(String, nullable=True)
+
     created_at = Column(TIMESTAMP(), server_default=func.now())
     updated_at = Column(TIMESTAMP(), server_default=func.now(), onupdate=func.now())
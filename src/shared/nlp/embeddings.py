@@ -1,31 +1,177 @@
+import hashlib
 import os
+from typing import Iterator, List
 
-from openai import OpenAI
+from openai import BadRequestError, OpenAI
 from pgvector import Vector
 
-from shared.models.calendar_event import CalendarEvent
-
 OPENAI_TOKEN = os.getenv("OPENAI_API_KEY")
 EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL")
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "256"))
+EMBEDDING_BATCH_MAX_TOKENS = int(os.getenv("EMBEDDING_BATCH_MAX_TOKENS", "100000"))
+# input limit of a single text of the embedding model
+EMBEDDING_MAX_INPUT_TOKENS = int(os.getenv("EMBEDDING_MAX_INPUT_TOKENS", "8191"))
+# text-embedding-3 models can return shortened vectors of the given size
+EMBEDDING_API_DIMENSIONS = os.getenv("EMBEDDING_DIMENSIONS")
+
+EMBEDDING_PARAMS = {"model": EMBEDDING_MODEL}
+if EMBEDDING_API_DIMENSIONS:
+    EMBEDDING_PARAMS["dimensions"] = int(EMBEDDING_API_DIMENSIONS)
+# vectors of different sizes must not share cache entries
+EMBEDDING_CACHE_KEY = (
+    f"{EMBEDDING_MODEL}:{EMBEDDING_API_DIMENSIONS}"
+    if EMBEDDING_API_DIMENSIONS
+    else EMBEDDING_MODEL
+)
 
 client = OpenAI(api_key=OPENAI_TOKEN)
 
 
-def embed_calendar_event(event: CalendarEvent) -> Vector:
+def embed_texts(texts: List[str], progress_callback=None) -> List[Vector | None]:
     """
-    Embed a calendar event into a vector representation.
+    Embed a list of texts, packing many of them into each API request.
 
-    This function converts the given calendar event into a text form and sends it
-    to the embedding model to generate a numerical vector used for semantic search.
+    Texts are grouped into batches limited both by item count
+    (`EMBEDDING_BATCH_SIZE`) and by an estimated token budget
+    (`EMBEDDING_BATCH_MAX_TOKENS`). A batch that fails is split in half and
+    retried, so a single bad input does not abort the whole run, see
+    `embed_batch`.
 
     Args:
-        event (CalendarEvent): The calendar event object to be encoded into an embedding.
+        texts (List[str]): The texts to embed.
+        progress_callback (callable, optional): Called as
+            `progress_callback(current, total)` for every embedded text.
 
     Return:
-        Vector: A vector representation (embedding) of the calendar event.
+        List[Vector | None]: Vectors in the same order as the given texts,
+            None for a text the embedding model rejects.
     """
-    resp = client.embeddings.create(model=EMBEDDING_MODEL, input=event.to_str())
-    return Vector(resp.data[0].embedding)
+    total = len(texts) or 1
+    vectors: List[Vector | None] = []
+
+    for batch in iter_batches(texts):
+        start = len(vectors)
+        vectors.extend(embed_batch(batch))
+
+        if progress_callback:
+            for idx in range(start + 1, len(vectors) + 1):
+                progress_callback(idx, total)
+
+    return vectors
+
+
+def embed_batch(texts: List[str]) -> List[Vector | None]:
+    """
+    Embed a single batch of texts in one request, splitting it if it is rejected.
+
+    Only a rejected request (e.g. too large, or with an invalid text) is split
+    in halves and retried, which isolates the offending text. A rejected text
+    longer than `EMBEDDING_MAX_INPUT_TOKENS` is truncated to it and retried;
+    any other rejected text is skipped. Other errors, such as authentication
+    failures, rate limits or outages, would fail for the halves too and are
+    raised right away.
+
+    Args:
+        texts (List[str]): The texts that make up the batch.
+
+    Return:
+        List[Vector | None]: Vectors in the same order as the given texts,
+            None for a text the embedding model rejects.
+
+    Raises:
+        OpenAIError: If the request fails for any reason other than a
+            rejected input.
+    """
+    try:
+        resp = client.embeddings.create(**EMBEDDING_PARAMS, input=texts)
+    except BadRequestError as e:
+        if len(texts) == 1:
+            text = truncate_to_tokens(texts[0], EMBEDDING_MAX_INPUT_TOKENS)
+            if text != texts[0]:
+                print(f"Embedding input of {len(texts[0])} chars truncated:", repr(e))
+                return embed_batch([text])
+            print("Embedding input rejected, skipping it:", repr(e))
+            return [None]
+        print(f"Embedding batch of {len(texts)} failed, splitting:", repr(e))
+        middle = len(texts) // 2
+        return embed_batch(texts[:middle]) + embed_batch(texts[middle:])
+
+    data = sorted(resp.data, key=lambda item: item.index)
+    return [Vector(item.embedding) for item in data]
+
+
+def iter_batches(texts: List[str]) -> Iterator[List[str]]:
+    """
+    Split texts into consecutive batches that respect the request limits.
+
+    Args:
+        texts (List[str]): The texts to split.
+
+    Return:
+        Iterator[List[str]]: Consecutive, order-preserving batches of texts.
+    """
+    batch: List[str] = []
+    batch_tokens = 0
+
+    for text in texts:
+        tokens = estimate_tokens(text)
+        if batch and (
+            len(batch) >= EMBEDDING_BATCH_SIZE
+            or batch_tokens + tokens > EMBEDDING_BATCH_MAX_TOKENS
+        ):
+            yield batch
+            batch, batch_tokens = [], 0
+
+        batch.append(text)
+        batch_tokens += tokens
+
+    if batch:
+        yield batch
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Roughly estimate the number of tokens in a text.
+
+    Cyrillic text tokenizes noticeably denser than English, so the estimate
+    deliberately errs on the high side (about two characters per token).
+
+    Args:
+        text (str): The text to estimate.
+
+    Return:
+        int: The estimated token count.
+    """
+    return len(text) // 2 + 1
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """
+    Cut a text so that its estimated token count fits the limit.
+
+    Args:
+        text (str): The text to cut.
+        max_tokens (int): The token limit, see `estimate_tokens`.
+
+    Return:
+        str: The text itself if it fits, otherwise its longest fitting prefix.
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    return text[: (max_tokens - 1) * 2]
+
+
+def text_hash(text: str) -> str:
+    """
+    Compute the content hash of a text that is sent to the embedding model.
+
+    Args:
+        text (str): The text to hash.
+
+    Return:
+        str: The hex-encoded SHA-256 digest of the UTF-8 encoded text.
+    """
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
 
 
 def embed_query(query: str) -> Vector:
@@ -41,5 +187,5 @@ def embed_query(query: str) -> Vector:
     Return:
         Vector: A vector representation (embedding) of the input query.
     """
-    resp = client.embeddings.create(model=EMBEDDING_MODEL, input=query)
+    resp = client.embeddings.create(**EMBEDDING_PARAMS, input=query)
     return Vector(resp.data[0].embedding)
@@ -0,0 +1,162 @@
+import calendar
+import re
+from datetime import date, timedelta
+
+WEEKDAYS = [
+    re.compile(rf"\b(?:(?P<modifier>следующ|прошл|эт)\w*\s+)?{day}\b")
+    for day in [
+        r"понедельник\w{0,2}",
+        r"вторник\w{0,2}",
+        r"сред[аеуы]",
+        r"четверг\w{0,2}",
+        r"пятниц[аеуы]",
+        r"суббот[аеуы]",
+        r"воскресень[еяю]",
+    ]
+]
+
+# phrase -> function of today returning the (start, end) range, inclusive
+PHRASES = [
+    (r"\bпослезавтра\b", lambda today: day_range(today + timedelta(days=2))),
+    (r"\bпозавчера\b", lambda today: day_range(today - timedelta(days=2))),
+    (r"\bсегодня(?:шн\w*)?\b", lambda today: day_range(today)),
+    (r"\bзавтра(?:шн\w*)?\b", lambda today: day_range(today + timedelta(days=1))),
+    (r"\bвчера(?:шн\w*)?\b", lambda today: day_range(today - timedelta(days=1))),
+    (r"\bчерез\s+неделю\b", lambda today: day_range(today + timedelta(days=7))),
+    (r"\b(?:на\s+)?следующ\w*\s+недел\w*", lambda today: week_range(today, 1)),
+    (r"\b(?:на\s+)?прошл\w*\s+недел\w*", lambda today: week_range(today, -1)),
+    (r"\b(?:на\s+)?(?:эт\w*\s+)?недел[еюи]\b", lambda today: week_range(today, 0)),
+    (r"\b(?:в\s+)?следующ\w*\s+месяц\w*", lambda today: month_range(today, 1)),
+    (r"\b(?:в\s+)?прошл\w*\s+месяц\w*", lambda today: month_range(today, -1)),
+    (r"\b(?:в\s+)?эт\w*\s+месяц\w*", lambda today: month_range(today, 0)),
+]
+
+# a word right before the period that makes it a bound of another period,
+# e.g. "до пятницы", "к пятнице", "с завтра", "до конца недели"
+RANGE_BOUND = re.compile(
+    r"\b(?:до|к|ко|с|со|по|между|кроме|конц\w*|начал\w*|середин\w*)\s*$"
+)
+
+# what is left of the question must not name another period
+UNSUPPORTED = re.compile(
+    r"\d{1,2}\s*[./-]\s*\d{1,2}"
+    r"|\d+\s*(?:дн|день|недел|месяц|год)"
+    r"|\b(?:через|после|выходн|будн|ближайш|последн|год|квартал|числ|месяц|недел"
+    r"|январ|феврал|март|апрел|ма[йя]\b|июн|июл|август|сентябр|октябр|ноябр|декабр)"
+)
+
+
+def day_range(day: date) -> tuple[date, date]:
+    return day, day
+
+
+def week_range(today: date, offset: int) -> tuple[date, date]:
+    monday = today - timedelta(days=today.weekday()) + timedelta(weeks=offset)
+    return monday, monday + timedelta(days=6)
+
+
+def month_range(today: date, offset: int) -> tuple[date, date]:
+    year, month = divmod(today.year * 12 + today.month - 1 + offset, 12)
+    month += 1
+    return date(year, month, 1), date(year, month, calendar.monthrange(year, month)[1])
+
+
+def weekday_range(today: date, weekday: int, modifier: str | None) -> tuple[date, date]:
+    monday = today - timedelta(days=today.weekday())
+    if modifier == "следующ":
+        return day_range(monday + timedelta(weeks=1, days=weekday))
+    if modifier == "прошл":
+        return day_range(monday - timedelta(weeks=1) + timedelta(days=weekday))
+    if modifier == "эт" or weekday > today.weekday():
+        return day_range(monday + timedelta(days=weekday))
+    return day_range(monday + timedelta(weeks=1, days=weekday))
+
+
+def parse_date_range(text: str, today: date | None = None) -> tuple[date, date] | None:
+    """
+    Resolve the relative period a question asks about without the chat model.
+
+    Supports the phrases described for `date_tool`: today, tomorrow,
+    yesterday, in a week, weekdays and this, next or previous week or month,
+    resolved by the same rules. A weekday without a modifier means its date in
+    the current week if it is still ahead, and in the next week otherwise.
+
+    The result is returned only when it is unambiguous: exactly one period is
+    named and the rest of the question does not mention another date or
+    period. Otherwise None is returned and the period is left to the model.
+    The same weekday as today without a modifier is left to the model as well,
+    and so is a period used as a bound of another one, e.g. "до пятницы" or
+    "до конца недели".
+
+    Args:
+        text (str): The user's question.
+        today (date | None): The date the question is relative to; today by default.
+
+    Return:
+        tuple[date, date] | None: The first and the last day of the period,
+            or None if it cannot be resolved with confidence.
+    """
+    return split_date_range(text, today)[0]
+
+
+def mentions_date(text: str) -> bool:
+    """
+    Check whether a question mentions any date, period or number at all.
+
+    Unlike `parse_date_range` this does not resolve anything, so it also
+    recognises what is left to the chat model, such as "15 марта" or
+    "через 3 дня".
+
+    Args:
+        text (str): The user's question.
+
+    Return:
+        bool: True if the question names a date, a period or a number.
+    """
+    text = text.lower().replace("ё", "е")
+    return bool(
+        re.search(r"\d", text)
+        or UNSUPPORTED.search(text)
+        or any(re.search(pattern, text) for pattern, _ in PHRASES)
+        or any(pattern.search(text) for pattern in WEEKDAYS)
+    )
+
+
+def split_date_range(
+    text: str, today: date | None = None
+) -> tuple[tuple[date, date] | None, str]:
+    """
+    Resolve the period of a question and return what is left of the question.
+
+    Args:
+        text (str): The user's question.
+        today (date | None): The date the question is relative to; today by default.
+
+    Return:
+        tuple[tuple[date, date] | None, str]: The period as `parse_date_range`
+            returns it, and the lowercased question without the period phrases.
+    """
+    today = today or date.today()
+    rest = text.lower().replace("ё", "е")
+
+    ranges = set()
+    ambiguous = False
+    for pattern, resolve in PHRASES:
+        for match in re.finditer(pattern, rest):
+            if RANGE_BOUND.search(rest, 0, match.start()):
+                ambiguous = True
+            ranges.add(resolve(today))
+        rest = re.sub(pattern, " ", rest)
+
+    for weekday, pattern in enumerate(WEEKDAYS):
+        for match in pattern.finditer(rest):
+            if RANGE_BOUND.search(rest, 0, match.start()):
+                ambiguous = True
+            if match["modifier"] is None and weekday == today.weekday():
+                ambiguous = True
+            ranges.add(weekday_range(today, weekday, match["modifier"]))
+        rest = pattern.sub(" ", rest)
+
+    if ambiguous or len(ranges) != 1 or UNSUPPORTED.search(rest):
+        return None, rest
+    return ranges.pop(), rest
@@ -0,0 +1,65 @@
+from queue import Full, Queue
+from threading import Event, Thread
+from typing import Iterable, Iterator
+
+_DONE = object()
+
+
+class Prefetcher:
+    """
+    Iterate over items produced by a background thread.
+
+    The producer runs at most `size` items ahead of the consumer, so a slow
+    consumer keeps memory bounded while the next items are already being
+    fetched. Exceptions raised by the producer are re-raised in the consumer.
+    """
+
+    def __init__(self, items: Iterable, size: int = 2):
+        self._queue: Queue = Queue(maxsize=size)
+        self._stopped = Event()
+        self._thread = Thread(target=self._produce, args=(items,), daemon=True)
+        self._thread.start()
+
+    def __iter__(self) -> Iterator:
+        try:
+            while True:
+                item = self._queue.get()
+                if item is _DONE:
+                    return
+                if isinstance(item, _Failure):
+                    raise item.error
+                yield item
+        finally:
+            self.close()
+
+    def close(self):
+        """
+        Stop the producer and drop the items it has fetched ahead.
+        """
+        self._stopped.set()
+        while not self._queue.empty():
+            self._queue.get_nowait()
+
+    def _produce(self, items: Iterable):
+        try:
+            for item in items:
+                if not self._put(item):
+                    return
+        except Exception as e:
+            self._put(_Failure(e))
+            return
+        self._put(_DONE)
+
+    def _put(self, item) -> bool:
+        while not self._stopped.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except Full:
+                continue
+        return False
+
+
+class _Failure:
+    def __init__(self, error: Exception):
+        self.error = error
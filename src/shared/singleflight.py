@@ -0,0 +1,61 @@
+from concurrent.futures import Future
+from threading import Lock
+from typing import Callable, Hashable
+
+
+class SingleFlight:
+    """
+    Collapse concurrent calls with the same key into one execution.
+
+    The first caller for a key runs the function; callers that arrive while it
+    is still running wait for it and receive the same result or exception.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._calls: dict[Hashable, Future] = {}
+
+    def do(self, key: Hashable, fn: Callable, *args, **kwargs):
+        """
+        Run `fn(*args, **kwargs)` unless a call with the same key is in flight.
+
+        Args:
+            key (Hashable): Identifies calls that may share a result.
+            fn (Callable): The function to run.
+
+        Return:
+            The result of the running or the new call.
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    def in_flight(self, key: Hashable) -> bool:
+        """
+        Check whether a call with the given key is currently running.
+
+        Args:
+            key (Hashable): The call key.
+
+        Return:
+            bool: True if a call is in flight.
+        """
+        with self._lock:
+            return key in self._calls
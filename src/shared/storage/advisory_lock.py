@@ -0,0 +1,29 @@
+from contextlib import contextmanager
+from typing import Iterator
+
+from sqlalchemy import text
+
+from shared.storage.db import engine
+
+
+@contextmanager
+def advisory_lock(key: int) -> Iterator[None]:
+    """
+    Hold a PostgreSQL session-level advisory lock for the duration of the block.
+
+    The lock is shared by every process connected to the database, so it
+    serializes work that must not run concurrently, e.g. two syncs of the same
+    user started by different bot instances. Blocks until the lock is free.
+    The connection holding the lock runs in autocommit mode, so it does not
+    sit idle in a transaction while the block runs.
+
+    Args:
+        key (int): The 64-bit lock key.
+    """
+    with engine.connect() as connection:
+        connection = connection.execution_options(isolation_level="AUTOCOMMIT")
+        connection.execute(text("SELECT pg_advisory_lock(:key)"), {"key": key})
+        try:
+            yield
+        finally:
+            connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": key})
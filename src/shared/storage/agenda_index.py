@@ -0,0 +1,125 @@
+import os
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, time, timezone, tzinfo
+
+from shared.models.user import TgUser
+from shared.storage.embeddings_repo import RetrievedEvent, get_user_events
+from shared.storage.user_index_cache import UserIndexCache
+from shared.storage.users_repo import user_timezone
+
+AGENDA_INDEX_MAX_USERS = int(os.getenv("AGENDA_INDEX_MAX_USERS", "1024"))
+AGENDA_INDEX_TTL_SECONDS = float(os.getenv("AGENDA_INDEX_TTL_SECONDS", "600"))
+
+
+class AgendaIndex:
+    """
+    The events of one user sorted by start time.
+
+    `starts[i]` is the start time of `events[i]`, so the events starting
+    within a range are found with two binary searches.
+    """
+
+    def __init__(self, events: list[RetrievedEvent]):
+        self.events = events
+        self.starts = [event.start_ts for event in events]
+
+    @classmethod
+    def load(cls, user: TgUser) -> "AgendaIndex":
+        return cls(get_user_events(user))
+
+    def between(self, start: datetime, end: datetime) -> list[RetrievedEvent]:
+        lo = bisect_left(self.starts, to_stored_time(start))
+        hi = bisect_right(self.starts, to_stored_time(end))
+        return self.events[lo:hi]
+
+
+def to_stored_time(value: datetime) -> datetime:
+    """
+    Convert a datetime to the naive UTC form `start_ts` is stored in.
+
+    Args:
+        value (datetime): A naive or aware datetime.
+
+    Return:
+        datetime: The naive datetime comparable with stored start times.
+    """
+    if value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def is_all_day(event: RetrievedEvent) -> bool:
+    """
+    Check whether an event is an all-day event.
+
+    All-day events are stored with the naive midnights of their first day and
+    of the day after their last day, not converted from any time zone.
+    """
+    return (
+        event.end_ts is not None
+        and event.start_ts.time() == event.end_ts.time() == time.min
+        and event.end_ts > event.start_ts
+    )
+
+
+def local_times(
+    event: RetrievedEvent, zone: tzinfo
+) -> tuple[datetime, datetime | None]:
+    """
+    Convert the stored start and end of an event to naive times in a time zone.
+
+    Args:
+        event (RetrievedEvent): The event.
+        zone (tzinfo): The time zone to convert to, see `user_timezone`.
+
+    Return:
+        tuple[datetime, datetime | None]: The start and the end of the event.
+            All-day events keep their stored dates.
+    """
+    if is_all_day(event):
+        return event.start_ts, event.end_ts
+    return tuple(
+        value
+        and value.replace(tzinfo=timezone.utc).astimezone(zone).replace(tzinfo=None)
+        for value in (event.start_ts, event.end_ts)
+    )
+
+
+agenda_indexes: UserIndexCache[AgendaIndex] = UserIndexCache(
+    AgendaIndex.load, AGENDA_INDEX_MAX_USERS, AGENDA_INDEX_TTL_SECONDS
+)
+
+
+def search_agenda_days(
+    user: TgUser, start: date, end: date, top_k: int = 50
+) -> list[RetrievedEvent]:
+    """
+    Find the user's events that start between the first and the last given day.
+
+    Events are served without a database query from an in-process index of
+    the user's events, which is built on first use and dropped when the
+    user's calendars are synced. The days are meant in the user's time zone, see `user_timezone`: timed
+    events are looked up by the UTC bounds of these days, and all-day events
+    by their stored dates.
+
+    Args:
+        user (TgUser): The Telegram user whose events are searched.
+        start (date): The first day of the range.
+        end (date): The last day of the range, inclusive.
+        top_k (int): The maximum number of events to return.
+
+    Return:
+        list[RetrievedEvent]: The events of the range, earliest first.
+    """
+    zone = user_timezone(user)
+    index = agenda_indexes.get(user)
+    timed = index.between(
+        datetime.combine(start, time.min, zone), datetime.combine(end, time.max, zone)
+    )
+    all_day = index.between(
+        datetime.combine(start, time.min), datetime.combine(end, time.max)
+    )
+    events = [event for event in timed if not is_all_day(event)]
+    events += [event for event in all_day if is_all_day(event)]
+    events.sort(key=lambda event: local_times(event, zone)[0])
+    return events[:top_k]
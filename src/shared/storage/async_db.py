@@ -0,0 +1,27 @@
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from shared.storage.db import (
+    DATABASE_URL,
+    DB_MAX_OVERFLOW,
+    DB_POOL_SIZE,
+    DB_STATEMENT_CACHE_SIZE,
+    POOL_OPTIONS,
+)
+from shared.storage.pool_metrics import PoolMetrics
+
+ASYNC_DATABASE_URL = make_url(DATABASE_URL).set(drivername="postgresql+asyncpg")
+
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    # asyncpg's own cache of prepared statements per connection
+    connect_args={"prepared_statement_cache_size": DB_STATEMENT_CACHE_SIZE},
+    **POOL_OPTIONS,
+)
+async_pool_metrics = PoolMetrics("async", DB_POOL_SIZE + DB_MAX_OVERFLOW)
+async_pool_metrics.attach(async_engine.sync_engine)
+
+
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, autoflush=False, expire_on_commit=False
+)
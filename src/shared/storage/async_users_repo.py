@@ -0,0 +1,54 @@
+from shared.models.user import TgUser
+from shared.storage.async_db import AsyncSessionLocal
+from shared.storage.users_repo import user_cache
+
+
+async def get_user(user_id: int) -> TgUser | None:
+    """
+    Retrieve a Telegram user record without blocking the event loop.
+
+    The async counterpart of `users_repo.get_user`.
+
+    Args:
+        user_id (int): The unique identifier of the Telegram user to retrieve.
+
+    Returns:
+        TgUser | None: The user object if found, otherwise None.
+    """
+    user = user_cache.get(user_id)
+    if user is not None:
+        return user
+
+    async with AsyncSessionLocal() as session:
+        user = await session.get(TgUser, user_id)
+    if user is not None:
+        user_cache.put(user_id, user)
+    return user
+
+
+async def save_tokens(user_id: int, access: str, refresh: str, expiry: str):
+    """
+    Store or update Google OAuth tokens of a user without blocking the event loop.
+
+    The async counterpart of `users_repo.save_tokens`.
+
+    Args:
+        user_id (int): The unique identifier of the Telegram user whose tokens are being updated.
+        access (str): The Google OAuth access token.
+        refresh (str): The Google OAuth refresh token.
+        expiry (str): The expiration timestamp of the access token.
+
+    Raises:
+        ValueError: If the specified user cannot be found in the database.
+    """
+    async with AsyncSessionLocal() as session:
+        user = await session.get(TgUser, user_id)
+        if not user:
+            raise ValueError("User not found")
+
+        user.google_access_token = access
+        user.google_refresh_token = refresh
+        user.token_expiry = expiry
+
+        await session.commit()
+    user_cache.invalidate(user_id)
@@ -0,0 +1,51 @@
+from typing import Iterable
+
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert
+
+from shared.models.calendar_version import CalendarVersion
+from shared.storage.db import SessionLocal
+
+
+def get_calendar_version(user_id: int) -> int:
+    """
+    Retrieve the version of a user's stored events.
+
+    Anything derived from the events can remember the version it was computed
+    from and be discarded once the version has moved on. The version is kept
+    in the database, so changes made by any process are noticed by all.
+
+    Args:
+        user_id (int): The unique identifier of the Telegram user.
+
+    Returns:
+        int: The current version, 0 if the events have never changed.
+    """
+    with SessionLocal() as session:
+        version = session.get(CalendarVersion, user_id)
+        return version.version if version else 0
+
+
+def bump_calendar_versions(user_ids: Iterable[int]):
+    """
+    Mark the stored events of the given users as changed.
+
+    Args:
+        user_ids (Iterable[int]): The users whose events were written or removed.
+    """
+    # in key order, so concurrent bumps lock the rows in the same order
+    user_ids = sorted(set(user_ids))
+    if not user_ids:
+        return
+
+    stmt = (
+        insert(CalendarVersion)
+        .values([{"user_id": user_id, "version": 1} for user_id in user_ids])
+        .on_conflict_do_update(
+            index_elements=["user_id"],
+            set_={"version": CalendarVersion.version + 1, "updated_at": func.now()},
+        )
+    )
+    with SessionLocal() as session:
+        session.execute(stmt)
+        session.commit()
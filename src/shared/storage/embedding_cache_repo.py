@@ -0,0 +1,124 @@
+from datetime import timedelta
+
+from pgvector import Vector
+from sqlalchemy import delete, func, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert
+
+from shared.models.embedding_cache import EmbeddingCache
+from shared.storage.db import SessionLocal
+from shared.storage.embeddings_repo import RETENTION_BATCH_SIZE
+
+# how stale `last_used_at` may get before a lookup refreshes it
+CACHE_TOUCH_INTERVAL = timedelta(days=1)
+
+
+def get_cached_vectors(model: str, hashes: set[str]) -> dict[str, Vector]:
+    """
+    Look up previously computed vectors by the hash of their embedded text.
+
+    The `last_used_at` of the found entries is refreshed if it is older than
+    `CACHE_TOUCH_INTERVAL`, so entries still in use are kept by the retention
+    job. Rows that another sync is refreshing at the same time are skipped
+    rather than waited for.
+
+    Args:
+        model (str): The embedding model and vector size, see `EMBEDDING_CACHE_KEY`.
+        hashes (set[str]): Content hashes of the texts to look up.
+
+    Return:
+        dict[str, Vector]: Cached vectors keyed by content hash. Hashes that
+            are not cached are absent from the result.
+    """
+    if not hashes:
+        return {}
+
+    stmt = select(EmbeddingCache.text_hash, EmbeddingCache.message).where(
+        EmbeddingCache.model == model,
+        EmbeddingCache.text_hash.in_(hashes),
+    )
+    with SessionLocal() as session:
+        vectors = {text_hash: message for text_hash, message in session.execute(stmt)}
+        if vectors:
+            stale = (
+                select(EmbeddingCache.text_hash)
+                .where(
+                    EmbeddingCache.model == model,
+                    EmbeddingCache.text_hash.in_(list(vectors)),
+                    EmbeddingCache.last_used_at < func.now() - CACHE_TOUCH_INTERVAL,
+                )
+                .order_by(EmbeddingCache.text_hash)
+                .with_for_update(skip_locked=True)
+            )
+            session.execute(
+                update(EmbeddingCache)
+                .where(
+                    EmbeddingCache.model == model,
+                    EmbeddingCache.text_hash.in_(stale),
+                )
+                .values(last_used_at=func.now())
+            )
+            session.commit()
+        return vectors
+
+
+def save_cached_vectors(model: str, vectors: dict[str, Vector]):
+    """
+    Store freshly computed vectors in the content-addressed cache.
+
+    Entries that already exist are left untouched, since the same text and
+    model always produce an equivalent vector. Rows are inserted in key order,
+    so concurrent syncs sharing texts lock them in the same order and cannot
+    deadlock.
+
+    Args:
+        model (str): The embedding model and vector size, see `EMBEDDING_CACHE_KEY`.
+        vectors (dict[str, Vector]): Vectors keyed by content hash.
+    """
+    if not vectors:
+        return
+
+    stmt = (
+        insert(EmbeddingCache)
+        .values(
+            [
+                {"model": model, "text_hash": text_hash, "message": message}
+                for text_hash, message in sorted(vectors.items())
+            ]
+        )
+        .on_conflict_do_nothing(index_elements=["model", "text_hash"])
+    )
+    with SessionLocal() as session:
+        session.execute(stmt)
+        session.commit()
+
+
+def remove_unused_cached_vectors(max_age: timedelta) -> int:
+    """
+    Delete cached vectors that no sync has used for a while.
+
+    Rows are removed in batches of `RETENTION_BATCH_SIZE`, each in its own
+    short transaction.
+
+    Args:
+        max_age (timedelta): Entries last used longer ago are deleted.
+
+    Return:
+        int: The number of deleted entries.
+    """
+    removed = 0
+    while True:
+        unused = (
+            select(EmbeddingCache.model, EmbeddingCache.text_hash)
+            .where(EmbeddingCache.last_used_at < func.now() - max_age)
+            .limit(RETENTION_BATCH_SIZE)
+        )
+        stmt = delete(EmbeddingCache).where(
+            tuple_(EmbeddingCache.model, EmbeddingCache.text_hash).in_(unused)
+        )
+        with SessionLocal() as session:
+            count = session.execute(stmt).rowcount
+            session.commit()
+
+        removed += count
+        if count < RETENTION_BATCH_SIZE:
+            return removed
@@ -1,51 +1,543 @@
-from datetime import date
+import csv
+import io
+import os
+from datetime import datetime, timezone
+from typing import NamedTuple
 
-from pgvector import Vector
-from sqlalchemy import and_, select
+from pgvector import HalfVector, Vector
+from pgvector.sqlalchemy import BIT
+from sqlalchemy import (
+    Float,
+    Select,
+    Text,
+    bindparam,
+    cast,
+    delete,
+    exists,
+    func,
+    literal,
+    select,
+    tuple_,
+    union_all,
+    update,
+)
+from sqlalchemy.dialects.postgresql import TSQUERY, insert
+from sqlalchemy.orm import Session
 
-from shared.models.embedding import Embedding
+from shared.models.embedding import EMBEDDING_DIMENSIONS, VECTOR_QUANTIZATION, Embedding
+from shared.models.embedding_archive import EmbeddingArchive
 from shared.models.user import TgUser
 from shared.storage.db import SessionLocal
 
+UPSERT_BATCH_SIZE = int(os.getenv("EMBEDDING_UPSERT_BATCH_SIZE", "500"))
+COPY_NULL = "\\N"
 
-def search_similar_embeddings(
+HNSW_EF_SEARCH = int(os.getenv("HNSW_EF_SEARCH", "40"))
+# "relaxed_order", "strict_order" or "off"; needs pgvector 0.8+ unless "off"
+HNSW_ITERATIVE_SCAN = os.getenv("HNSW_ITERATIVE_SCAN", "relaxed_order")
+# how many binary-quantized candidates per result are re-ranked exactly
+VECTOR_RERANK_FACTOR = int(os.getenv("VECTOR_RERANK_FACTOR", "4"))
+
+RETENTION_BATCH_SIZE = int(os.getenv("RETENTION_BATCH_SIZE", "1000"))
+
+HYBRID_CANDIDATES = int(os.getenv("HYBRID_SEARCH_CANDIDATES", "20"))
+HYBRID_RRF_K = int(os.getenv("HYBRID_SEARCH_RRF_K", "60"))
+
+EMBEDDING_COLUMNS = [
+    column.name for column in Embedding.__table__.columns if column.computed is None
+]
+ARCHIVE_COLUMNS = [
+    column.name
+    for column in EmbeddingArchive.__table__.columns
+    if column.name != "archived_at"
+]
+# columns that may change while the embedded text, and so the vector, stays the same
+METADATA_COLUMNS = [
+    name
+    for name in EMBEDDING_COLUMNS
+    if name
+    not in (
+        "id",
+        "user_id",
+        "event_id",
+        "calendar_id",
+        "message",
+        "content_hash",
+        "combined_text",
+    )
+]
+TIMEZONE_COLUMNS = {
+    column.name
+    for column in Embedding.__table__.columns
+    if getattr(column.type, "timezone", False)
+}
+
+
+class EventVersion(NamedTuple):
+    event_id: str
+    updated: datetime | None
+    content_hash: str | None
+
+
+class RetrievedEvent(NamedTuple):
+    id: str
+    event_id: str
+    combined_text: str | None
+    location: str | None
+    start_ts: datetime | None
+    end_ts: datetime | None
+    organizer_display_name: str | None
+
+
+RETRIEVED_COLUMNS = [getattr(Embedding, name) for name in RetrievedEvent._fields]
+
+
+def search_hybrid(
     user: TgUser,
     embedding: Vector,
     top_k: int = 5,
-) -> [Embedding]:
+    query: str | None = None,
+) -> list[RetrievedEvent]:
+    """
+    Find the user's events by both the query embedding and the query words.
+
+    The `HYBRID_SEARCH_CANDIDATES` nearest events and the same number of best
+    full-text matches are fused with Reciprocal Rank Fusion
+    (score = sum of 1 / (`HYBRID_SEARCH_RRF_K` + rank)) inside one SQL
+    statement. Full-text search uses the Russian configuration and matches any
+    of the query words, which catches names, rooms and companies that the
+    embedding misses. Without a query only the vector ranking is used.
+
+    The nearest events are ordered by L2 distance only, so the HNSW index on
+    `message` can serve them, see `nearest_events`. The index is searched
+    with `hnsw.ef_search` candidates (`HNSW_EF_SEARCH`, at least the number
+    of needed rows), and with `HNSW_ITERATIVE_SCAN` (relaxed order by
+    default) the scan continues until enough rows of the user pass the filter.
+
+    Args:
+        user (TgUser): The Telegram user whose events are searched.
+        embedding (Vector): The query embedding.
+        top_k (int): The maximum number of events to return.
+        query (str | None): The original query text.
+
+    Return:
+        list[RetrievedEvent]: The best events, highest fused score first.
+    """
+    candidates = max(HYBRID_CANDIDATES, top_k)
+
+    nearest = nearest_events(user, embedding, candidates).subquery("nearest")
+    vector_ranks = select(
+        nearest.c.id,
+        func.row_number().over(order_by=nearest.c.distance).label("rank"),
+    ).cte("vector_ranks")
+    ranks = [select(vector_ranks.c.id, vector_ranks.c.rank)]
+
+    if query:
+        # plainto_tsquery joins the words with AND; any of them should match
+        ts_query = cast(
+            func.replace(cast(func.plainto_tsquery("russian", query), Text), "&", "|"),
+            TSQUERY,
+        )
+        text_rank = func.ts_rank_cd(Embedding.search_vector, ts_query)
+        text_ranks = (
+            select(
+                Embedding.id,
+                func.row_number().over(order_by=text_rank.desc()).label("rank"),
+            )
+            .where(
+                Embedding.user_id == user.id,
+                Embedding.search_vector.op("@@")(ts_query),
+            )
+            .order_by(text_rank.desc())
+            .limit(candidates)
+            .cte("text_ranks")
+        )
+        ranks.append(select(text_ranks.c.id, text_ranks.c.rank))
+
+    fused = union_all(*ranks).subquery("fused")
+    scores = (
+        select(
+            fused.c.id,
+            func.sum(literal(1.0, Float) / (HYBRID_RRF_K + fused.c.rank)).label(
+                "score"
+            ),
+        )
+        .group_by(fused.c.id)
+        .subquery("scores")
+    )
     stmt = (
-        select(Embedding)
+        select(*RETRIEVED_COLUMNS)
+        .join(scores, Embedding.id == scores.c.id)
         .where(Embedding.user_id == user.id)
-        .order_by(
-            Embedding.start_ts.asc(),
-            Embedding.message.op("<->")(embedding),
-        )
-        .order_by(Embedding.start_ts.asc())
+        .order_by(scores.c.score.desc())
         .limit(top_k)
     )
     with SessionLocal() as session:
-        return session.execute(stmt).scalars().all()
+        for setting in vector_search_settings(candidates):
+            session.execute(setting)
+        return [RetrievedEvent(*row) for row in session.execute(stmt)]
 
 
-def search_events_by_date_range(
-    user: TgUser,
-    start_date: date,
-    end_date: date,
-    top_k: int = 50,
-) -> [Embedding]:
-    print(start_date)
-    print(end_date)
+def nearest_events(user: TgUser, embedding: Vector, limit: int) -> Select:
+    """
+    Select the IDs of the user's events nearest to the embedding.
+
+    With `VECTOR_QUANTIZATION` set to "binary" the index holds only the signs
+    of the vector components: `limit * VECTOR_RERANK_FACTOR` candidates are
+    taken by Hamming distance and re-ranked by the exact L2 distance to the
+    stored vectors.
+
+    Args:
+        user (TgUser): The Telegram user whose events are searched.
+        embedding (Vector): The query embedding.
+        limit (int): The maximum number of events to select.
+
+    Return:
+        Select: A statement selecting `id` and `distance`, nearest first.
+    """
+    distance = Embedding.message.l2_distance(embedding).label("distance")
+    stmt = select(Embedding.id, distance).where(Embedding.user_id == user.id)
+    if VECTOR_QUANTIZATION != "binary":
+        return stmt.order_by(distance).limit(limit)
+
+    bits = BIT(EMBEDDING_DIMENSIONS)
+    query = cast(embedding, Embedding.message.type)
+    hamming = cast(func.binary_quantize(Embedding.message), bits).op(
+        "<~>", return_type=Float
+    )(cast(func.binary_quantize(query), bits))
+    candidates = (
+        stmt.order_by(hamming)
+        .limit(limit * VECTOR_RERANK_FACTOR)
+        .subquery("candidates")
+    )
+    return (
+        select(candidates.c.id, candidates.c.distance)
+        .order_by(candidates.c.distance)
+        .limit(limit)
+    )
+
+
+def vector_search_settings(limit: int) -> list[Select]:
+    """
+    Build the statements that apply the HNSW search settings to the current
+    transaction. Run them before the search query in the same session.
+
+    Args:
+        limit (int): The number of nearest rows the query needs.
+
+    Return:
+        list[Select]: The `set_config` statements.
+    """
+    if VECTOR_QUANTIZATION == "binary":
+        limit *= VECTOR_RERANK_FACTOR
+    settings = {"hnsw.ef_search": max(HNSW_EF_SEARCH, limit)}
+    if HNSW_ITERATIVE_SCAN != "off":
+        settings["hnsw.iterative_scan"] = HNSW_ITERATIVE_SCAN
+    return [
+        select(func.set_config(name, str(value), True))
+        for name, value in settings.items()
+    ]
+
+
+def get_user_events(user: TgUser) -> list[RetrievedEvent]:
+    """
+    Load all events of the user that have a start time, earliest first.
+
+    Args:
+        user (TgUser): The Telegram user who owns the events.
+
+    Return:
+        list[RetrievedEvent]: The user's events ordered by `start_ts`.
+    """
     stmt = (
-        select(Embedding)
-        .where(
-            and_(
-                Embedding.user_id == user.id,
-                Embedding.start_ts >= start_date,
-                Embedding.start_ts <= end_date,
+        select(*RETRIEVED_COLUMNS)
+        .where(Embedding.user_id == user.id, Embedding.start_ts.is_not(None))
+        .order_by(Embedding.start_ts)
+    )
+    with SessionLocal() as session:
+        return [RetrievedEvent(*row) for row in session.execute(stmt)]
+
+
+def get_user_vectors(user: TgUser) -> list[tuple]:
+    """
+    Load what an in-memory index needs about all embedded events of the user.
+
+    Args:
+        user (TgUser): The Telegram user who owns the events.
+
+    Return:
+        list[tuple]: Rows of the `RetrievedEvent` fields followed by the
+            `message` vector.
+    """
+    stmt = select(*RETRIEVED_COLUMNS, Embedding.message).where(
+        Embedding.user_id == user.id, Embedding.message.is_not(None)
+    )
+    with SessionLocal() as session:
+        return [tuple(row) for row in session.execute(stmt)]
+
+
+def get_event_versions(
+    user: TgUser, calendar_id: str, event_ids: set[str]
+) -> dict[str, EventVersion]:
+    """
+    Load only what the sync diff needs to know about the stored events.
+
+    Only `event_id`, `updated` and `content_hash` are selected, so neither
+    vectors nor texts are transferred and no ORM objects are created.
+
+    Args:
+        user (TgUser): The Telegram user who owns the events.
+        calendar_id (str): The ID of the calendar the events belong to.
+        event_ids (set[str]): IDs of the events to look up.
+
+    Return:
+        dict[str, EventVersion]: Versions of the stored events keyed by event ID.
+    """
+    stmt = select(Embedding.event_id, Embedding.updated, Embedding.content_hash).where(
+        Embedding.user_id == user.id,
+        Embedding.calendar_id == calendar_id,
+        Embedding.event_id.in_(event_ids),
+    )
+    with SessionLocal() as session:
+        return {row.event_id: EventVersion(*row) for row in session.execute(stmt)}
+
+
+def has_embeddings(user: TgUser, calendar_id: str) -> bool:
+    """
+    Check whether any events of the user's calendar are stored.
+
+    Args:
+        user (TgUser): The Telegram user who owns the events.
+        calendar_id (str): The ID of the calendar.
+
+    Return:
+        bool: True if at least one row exists.
+    """
+    stmt = select(
+        exists().where(
+            Embedding.user_id == user.id,
+            Embedding.calendar_id == calendar_id,
+        )
+    )
+    with SessionLocal() as session:
+        return session.scalar(stmt)
+
+
+def remove_past_events(before: datetime, archive: bool = False) -> dict[int, int]:
+    """
+    Delete, or move to `tg_embeddings_archive`, events that ended before a time.
+
+    Rows are removed in batches of `RETENTION_BATCH_SIZE`, each in its own
+    short transaction, so that syncs are not blocked for long. Archived rows
+    keep the event's text and times but not its vectors.
+
+    Args:
+        before (datetime): Events ending (or, without an end, starting) earlier are removed.
+        archive (bool): Whether to copy the removed rows to the archive table.
+
+    Return:
+        dict[int, int]: The number of removed events per user ID.
+    """
+    removed: dict[int, int] = {}
+    while True:
+        expired = (
+            select(Embedding.id, Embedding.user_id)
+            .where(func.coalesce(Embedding.end_ts, Embedding.start_ts) < before)
+            .limit(RETENTION_BATCH_SIZE)
+        )
+        deleted = (
+            delete(Embedding)
+            .where(tuple_(Embedding.id, Embedding.user_id).in_(expired))
+            .returning(*[getattr(Embedding, name) for name in ARCHIVE_COLUMNS])
+            .cte("deleted")
+        )
+        stmt = select(deleted.c.user_id, func.count()).group_by(deleted.c.user_id)
+        if archive:
+            archived = (
+                insert(EmbeddingArchive)
+                .from_select(ARCHIVE_COLUMNS, select(deleted))
+                .on_conflict_do_nothing()
+                .cte("archived")
             )
+            stmt = stmt.add_cte(archived)
+
+        with SessionLocal() as session:
+            counts = session.execute(stmt).all()
+            session.commit()
+
+        if not counts:
+            return removed
+        for user_id, count in counts:
+            removed[user_id] = removed.get(user_id, 0) + count
+
+
+def upsert_embeddings(session: Session, rows: list[Embedding]) -> int:
+    """
+    Insert or update embedding rows with batched `INSERT ... ON CONFLICT` statements.
+
+    Each batch of `EMBEDDING_UPSERT_BATCH_SIZE` rows is written with a single
+    statement instead of a SELECT and an UPDATE per row. If several rows share
+    an ID, the last one wins. The caller commits.
+
+    Args:
+        session (Session): The open database session used for writing.
+        rows (list[Embedding]): Transient rows to write, matched by the
+            primary key (`id`, `user_id`).
+
+    Return:
+        int: The number of written rows.
+    """
+    rows = list({(row.id, row.user_id): row for row in rows}.values())
+    for start in range(0, len(rows), UPSERT_BATCH_SIZE):
+        values = [to_values(row) for row in rows[start : start + UPSERT_BATCH_SIZE]]
+        stmt = insert(Embedding).values(values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Embedding.id, Embedding.user_id],
+            set_={
+                name: stmt.excluded[name]
+                for name in EMBEDDING_COLUMNS
+                if name not in ("id", "user_id")
+            },
         )
-        .limit(top_k)
+        session.execute(stmt)
+
+    return len(rows)
+
+
+def update_embedding_metadata(session: Session, rows: list[Embedding]) -> int:
+    """
+    Rewrite only the metadata of rows whose embedded text did not change.
+
+    Used for edits such as RSVP or reminder changes: the vector, the text and
+    its hash are neither sent nor rewritten, just the columns in
+    `METADATA_COLUMNS`. Rows are matched by the primary key (`id`, `user_id`)
+    in one batched `UPDATE`. The caller commits.
+
+    Args:
+        session (Session): The open database session used for writing.
+        rows (list[Embedding]): Transient rows carrying the new metadata.
+
+    Return:
+        int: The number of rows sent.
+    """
+    if not rows:
+        return 0
+
+    table = Embedding.__table__
+    stmt = (
+        update(table)
+        .where(
+            table.c.id == bindparam("row_id"),
+            table.c.user_id == bindparam("row_user_id"),
+        )
+        .values({name: bindparam(name) for name in METADATA_COLUMNS})
+    )
+    session.execute(
+        stmt,
+        [
+            {
+                "row_id": row.id,
+                "row_user_id": row.user_id,
+                **{name: getattr(row, name) for name in METADATA_COLUMNS},
+            }
+            for row in rows
+        ],
     )
+    return len(rows)
 
-    with SessionLocal() as session:
-        return session.execute(stmt).scalars().all()
+
+def copy_embeddings(session: Session, rows: list[Embedding]) -> int:
+    """
+    Bulk-load new embedding rows with PostgreSQL `COPY`.
+
+    Meant for the first sync of a calendar, when none of the rows can exist
+    yet: `COPY` is the fastest way to load many rows, but it fails on
+    duplicate IDs instead of updating them. The caller commits.
+
+    Args:
+        session (Session): The open database session used for writing.
+        rows (list[Embedding]): Transient rows that are not stored yet.
+
+    Return:
+        int: The number of written rows.
+    """
+    if not rows:
+        return 0
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        values = to_values(row)
+        writer.writerow(
+            [
+                to_copy_value(values[name], name in TIMEZONE_COLUMNS)
+                for name in EMBEDDING_COLUMNS
+            ]
+        )
+    buffer.seek(0)
+
+    cursor = session.connection().connection.cursor()
+    cursor.copy_expert(
+        f"COPY {Embedding.__tablename__} ({', '.join(EMBEDDING_COLUMNS)}) "
+        f"FROM STDIN WITH (FORMAT csv, NULL '{COPY_NULL}')",
+        buffer,
+    )
+    return len(rows)
+
+
+def to_values(row: Embedding) -> dict:
+    """
+    Collect the column values of a transient embedding row.
+
+    Args:
+        row (Embedding): The row to convert.
+
+    Return:
+        dict: Column values keyed by column name.
+    """
+    return {name: getattr(row, name) for name in EMBEDDING_COLUMNS}
+
+
+def to_copy_value(value, keep_timezone: bool = False) -> str:
+    """
+    Format a column value as a field of a CSV `COPY` stream.
+
+    Aware datetimes written to a `TIMESTAMP` column are converted to UTC first,
+    since PostgreSQL would silently drop their offset.
+
+    Args:
+        value: The Python value of the column.
+        keep_timezone (bool): Whether the column is a `TIMESTAMP WITH TIME ZONE`.
+
+    Return:
+        str: The text representation PostgreSQL expects.
+    """
+    if value is None:
+        return COPY_NULL
+    if isinstance(value, (Vector, HalfVector)):
+        return value.to_text()
+    if hasattr(value, "tolist"):
+        return Vector(value.tolist()).to_text()
+    if isinstance(value, datetime):
+        if value.tzinfo and not keep_timezone:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value.isoformat()
+    if isinstance(value, (list, tuple)):
+        return "{" + ",".join(to_array_item(item) for item in value) + "}"
+    return str(value)
+
+
+def to_array_item(item) -> str:
+    """
+    Format an element of a PostgreSQL array literal.
+
+    Args:
+        item: The array element.
+
+    Return:
+        str: The quoted and escaped element, or NULL.
+    """
+    if item is None:
+        return "NULL"
+    escaped = str(item).replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{escaped}"'
@@ -0,0 +1,58 @@
+from threading import Lock
+
+from sqlalchemy import Engine, event
+
+from shared.storage.db import DB_MAX_OVERFLOW, DB_POOL_SIZE, engine
+
+
+class PoolMetrics:
+    """
+    Counters of a connection pool's usage.
+
+    `saturated` counts checkouts that took the last free connection: until a
+    connection is returned, further checkouts wait up to `DB_POOL_TIMEOUT`
+    seconds and then fail. A growing `saturated` means the pool is too small
+    for the load.
+    """
+
+    def __init__(self, name: str, capacity: int):
+        self.name = name
+        self.capacity = capacity
+        self.checkouts = 0
+        self.in_use = 0
+        self.peak_in_use = 0
+        self.saturated = 0
+        self._lock = Lock()
+
+    def attach(self, engine: Engine):
+        event.listen(engine, "checkout", self._on_checkout)
+        event.listen(engine, "checkin", self._on_checkin)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "capacity": self.capacity,
+                "checkouts": self.checkouts,
+                "in_use": self.in_use,
+                "peak_in_use": self.peak_in_use,
+                "saturated": self.saturated,
+            }
+
+    def _on_checkout(self, *args):
+        with self._lock:
+            self.checkouts += 1
+            self.in_use += 1
+            self.peak_in_use = max(self.peak_in_use, self.in_use)
+            saturated = self.in_use >= self.capacity
+            if saturated:
+                self.saturated += 1
+        if saturated:
+            print(f"DB pool '{self.name}' exhausted: all {self.capacity} in use")
+
+    def _on_checkin(self, *args):
+        with self._lock:
+            self.in_use = max(self.in_use - 1, 0)
+
+
+pool_metrics = PoolMetrics("sync", DB_POOL_SIZE + DB_MAX_OVERFLOW)
+pool_metrics.attach(engine)
@@ -0,0 +1,99 @@
+from datetime import datetime
+from typing import NamedTuple
+
+from sqlalchemy import delete, func
+from sqlalchemy.dialects.postgresql import insert
+
+from shared.models.calendar_sync_state import CalendarSyncState
+from shared.storage.db import SessionLocal
+
+
+class SyncState(NamedTuple):
+    sync_token: str
+    window_end: datetime | None
+
+
+def get_sync_state(user_id: int, calendar_id: str) -> SyncState | None:
+    """
+    Retrieve the Google Calendar sync token saved after the last successful sync.
+
+    Args:
+        user_id (int): The unique identifier of the Telegram user.
+        calendar_id (str): The ID of the synchronized calendar.
+
+    Returns:
+        SyncState | None: The saved `nextSyncToken` with the end of the sync
+            window it covers, or None if the calendar has never been
+            synchronized incrementally.
+    """
+    with SessionLocal() as session:
+        state = session.get(CalendarSyncState, (user_id, calendar_id))
+        if state is None or not state.sync_token:
+            return None
+        return SyncState(state.sync_token, state.window_end)
+
+
+def save_sync_token(
+    user_id: int, calendar_id: str, sync_token: str, window_end: datetime
+):
+    """
+    Store the Google Calendar sync token for the next incremental sync.
+
+    Args:
+        user_id (int): The unique identifier of the Telegram user.
+        calendar_id (str): The ID of the synchronized calendar.
+        sync_token (str): The `nextSyncToken` returned by the Google Calendar API.
+        window_end (datetime): The end of the sync window whose events are
+            stored, so the next sync knows which range has become visible since.
+    """
+    values = {"sync_token": sync_token, "window_end": window_end}
+    stmt = (
+        insert(CalendarSyncState)
+        .values(user_id=user_id, calendar_id=calendar_id, **values)
+        .on_conflict_do_update(
+            index_elements=["user_id", "calendar_id"],
+            set_={**values, "updated_at": func.now()},
+        )
+    )
+    with SessionLocal() as session:
+        session.execute(stmt)
+        session.commit()
+
+
+def clear_sync_token(user_id: int, calendar_id: str):
+    """
+    Forget the sync token so that the next sync of the calendar is a full one.
+
+    Args:
+        user_id (int): The unique identifier of the Telegram user.
+        calendar_id (str): The ID of the synchronized calendar.
+    """
+    with SessionLocal() as session:
+        session.execute(
+            delete(CalendarSyncState).where(
+                CalendarSyncState.user_id == user_id,
+                CalendarSyncState.calendar_id == calendar_id,
+            )
+        )
+        session.commit()
+
+
+def clear_other_sync_tokens(user_id: int, calendar_ids: set[str]):
+    """
+    Forget the sync tokens of all calendars of a user except the given ones.
+
+    Used when calendars disappear from the user's calendar list, so that a
+    calendar that is added back later starts with a full sync.
+
+    Args:
+        user_id (int): The unique identifier of the Telegram user.
+        calendar_ids (set[str]): IDs of the calendars whose tokens are kept.
+    """
+    with SessionLocal() as session:
+        session.execute(
+            delete(CalendarSyncState).where(
+                CalendarSyncState.user_id == user_id,
+                CalendarSyncState.calendar_id.not_in(calendar_ids),
+            )
+        )
+        session.commit()
@@ -0,0 +1,55 @@
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Callable, Generic, TypeVar
+
+from shared.models.user import TgUser
+
+IndexT = TypeVar("IndexT")
+
+
+class UserIndexCache(Generic[IndexT]):
+    """
+    In-process indexes of the most recently active users.
+
+    An index is built with `load(user)` on first use and kept for at most
+    `ttl_seconds`, which bounds staleness after syncs run by other processes;
+    at most `max_users` indexes are kept, evicting the least recently used.
+    `invalidate` drops a user's index after their events changed. An index
+    that was being built while the user was invalidated is returned to its
+    caller but not kept.
+    """
+
+    def __init__(
+        self, load: Callable[[TgUser], IndexT], max_users: int, ttl_seconds: float
+    ):
+        self._load = load
+        self._max_users = max_users
+        self._ttl_seconds = ttl_seconds
+        self._lock = Lock()
+        self._indexes: OrderedDict[int, tuple[float, IndexT]] = OrderedDict()
+        self._generations: dict[int, int] = {}
+
+    def get(self, user: TgUser) -> IndexT:
+        with self._lock:
+            entry = self._indexes.get(user.id)
+            if entry is not None and entry[0] > time.monotonic():
+                self._indexes.move_to_end(user.id)
+                return entry[1]
+            generation = self._generations.get(user.id, 0)
+
+        index = self._load(user)
+
+        with self._lock:
+            if self._generations.get(user.id, 0) == generation:
+                self._indexes[user.id] = (time.monotonic() + self._ttl_seconds, index)
+                self._indexes.move_to_end(user.id)
+                while len(self._indexes) > self._max_users:
+                    evicted, _ = self._indexes.popitem(last=False)
+                    self._generations.pop(evicted, None)
+        return index
+
+    def invalidate(self, user_id: int):
+        with self._lock:
+            self._indexes.pop(user_id, None)
+            self._generations[user_id] = self._generations.get(user_id, 0) + 1
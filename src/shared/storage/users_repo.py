@@ -1,5 +1,19 @@
+import os
+from datetime import datetime, tzinfo
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
 from shared.models.user import TgUser
 from shared.storage.db import SessionLocal
+from shared.ttl_cache import TTLCache
+
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "1024"))
+USER_CACHE_TTL_SECONDS = float(os.getenv("USER_CACHE_TTL_SECONDS", "60"))
+# IANA time zone of users whose calendar time zone is not known yet;
+# the server's local time zone if unset
+DEFAULT_TIMEZONE = os.getenv("DEFAULT_TIMEZONE")
+
+# detached TgUser records by ID, shared with async_users_repo
+user_cache: TTLCache[TgUser] = TTLCache(USER_CACHE_SIZE, USER_CACHE_TTL_SECONDS)
 
 
 def get_user(user_id: int) -> TgUser:
@@ -8,7 +22,8 @@ def get_user(user_id: int) -> TgUser:
 
     This function opens a new database session, fetches the user using its primary key,
     and returns the corresponding `TgUser` instance. If the user does not exist,
-    the function returns `None`.
+    the function returns `None`. Found users are cached for
+    `USER_CACHE_TTL_SECONDS`, so repeated lookups skip the database.
 
     Args:
         user_id (int): The unique identifier of the Telegram user to retrieve.
@@ -16,8 +31,14 @@ def get_user(user_id: int) -> TgUser:
     Returns:
         TgUser | None: The user object if found, otherwise None.
     """
+    user = user_cache.get(user_id)
+    if user is not None:
+        return user
+
     with SessionLocal() as session:
         user = session.get(TgUser, user_id)
+    if user is not None:
+        user_cache.put(user_id, user)
     return user
 
 
@@ -45,6 +66,7 @@ def create_user(user_id: int, first_name: str, last_name: str, username: str):
         session.add(user)
         session.commit()
         session.refresh(user)
+    user_cache.put(user_id, user)
     return user
 
 
@@ -76,3 +98,49 @@ def save_tokens(user_id: id, access: str, refresh: str, expiry: str):
         user.token_expiry = expiry
 
         session.commit()
+    user_cache.invalidate(user_id)
+
+
+def save_timezone(user_id: int, timezone: str):
+    """
+    Store the time zone of a user's primary calendar.
+
+    Args:
+        user_id (int): The unique identifier of the Telegram user.
+        timezone (str): The IANA time zone name, e.g. "Europe/Moscow".
+
+    Raises:
+        ValueError: If the specified user cannot be found in the database.
+    """
+    with SessionLocal() as session:
+        user = session.get(TgUser, user_id)
+        if not user:
+            raise ValueError("User not found")
+
+        user.timezone = timezone
+
+        session.commit()
+    user_cache.invalidate(user_id)
+
+
+def user_timezone(user: TgUser) -> tzinfo:
+    """
+    Return the time zone the user's dates and times are meant in.
+
+    This is the time zone of the user's primary calendar, saved on sync. Until
+    it is known, or if it is not a valid zone name, `DEFAULT_TIMEZONE` or the
+    server's local time zone is used.
+
+    Args:
+        user (TgUser): The Telegram user.
+
+    Return:
+        tzinfo: The user's time zone.
+    """
+    for name in (user.timezone, DEFAULT_TIMEZONE):
+        if name:
+            try:
+                return ZoneInfo(name)
+            except (ZoneInfoNotFoundError, ValueError):
+                print(f"Unknown time zone {name!r} of user {user.id}")
+    return datetime.now().astimezone().tzinfo
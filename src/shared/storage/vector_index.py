@@ -0,0 +1,88 @@
+import os
+
+import numpy as np
+from pgvector import Vector
+
+from shared.models.user import TgUser
+from shared.storage.embeddings_repo import RetrievedEvent, get_user_vectors
+from shared.storage.user_index_cache import UserIndexCache
+
+# a user with a few thousand 1536-d events takes tens of MB, keep few resident
+VECTOR_INDEX_MAX_USERS = int(os.getenv("VECTOR_INDEX_MAX_USERS", "16"))
+VECTOR_INDEX_TTL_SECONDS = float(os.getenv("VECTOR_INDEX_TTL_SECONDS", "600"))
+
+
+class UserVectorIndex:
+    """
+    The vectors of one user's events in a contiguous float32 matrix.
+
+    Rows are normalized, so a single matrix-vector product with the normalized
+    query gives the cosine similarity to every event. `events[i]` describes the
+    event of row `i`.
+    """
+
+    def __init__(self, events: list[RetrievedEvent], matrix: np.ndarray):
+        self.events = events
+        self.matrix = matrix
+
+    @classmethod
+    def load(cls, user: TgUser) -> "UserVectorIndex":
+        events = []
+        vectors = []
+        for row in get_user_vectors(user):
+            events.append(RetrievedEvent(*row[:-1]))
+            vectors.append(np.asarray(row[-1], dtype=np.float32))
+
+        if not vectors:
+            return cls([], np.empty((0, 0), dtype=np.float32))
+
+        matrix = np.vstack(vectors)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        matrix /= np.where(norms == 0, 1, norms)
+        return cls(events, matrix)
+
+    def search(self, embedding: Vector, top_k: int) -> list[RetrievedEvent]:
+        if not self.events or top_k <= 0:
+            return []
+
+        query = np.asarray(
+            embedding.to_numpy() if isinstance(embedding, Vector) else embedding,
+            dtype=np.float32,
+        )
+        scores = self.matrix @ (query / (np.linalg.norm(query) or 1))
+
+        k = min(top_k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [self.events[i] for i in top]
+
+
+vector_indexes: UserIndexCache[UserVectorIndex] = UserIndexCache(
+    UserVectorIndex.load, VECTOR_INDEX_MAX_USERS, VECTOR_INDEX_TTL_SECONDS
+)
+
+
+def search_in_memory(
+    user: TgUser,
+    embedding: Vector,
+    top_k: int = 5,
+    query: str | None = None,
+) -> list[RetrievedEvent]:
+    """
+    Find the user's events closest to the query embedding without a database query.
+
+    A drop-in `search_fn` for `answer_with_rag`: the user's vectors are loaded
+    once into an in-process index and ranked by cosine similarity with NumPy.
+    Only the embedding is used for ranking; `query` is accepted for
+    compatibility with `search_hybrid`.
+
+    Args:
+        user (TgUser): The Telegram user whose events are searched.
+        embedding (Vector): The query embedding.
+        top_k (int): The maximum number of events to return.
+        query (str | None): The original query text, unused.
+
+    Return:
+        list[RetrievedEvent]: The closest events, nearest first.
+    """
+    return vector_indexes.get(user).search(embedding, top_k)
@@ -0,0 +1,139 @@
+import os
+from collections import OrderedDict
+from contextlib import contextmanager
+from threading import Lock
+from typing import Iterator
+
+import httplib2
+from google_auth_httplib2 import AuthorizedHttp
+from googleapiclient.discovery import Resource, build
+from googleapiclient.http import HttpRequest
+
+from shared.models.user import TgUser
+from sources.google_calendar.credentials_manager import credentials_manager
+from sources.google_calendar.google_auth import PersistentCredentials
+
+HTTP_POOL_SIZE = int(os.getenv("GOOGLE_HTTP_POOL_SIZE", "4"))
+HTTP_POOL_MAX_USERS = int(os.getenv("GOOGLE_HTTP_POOL_MAX_USERS", "256"))
+HTTP_TIMEOUT = int(os.getenv("GOOGLE_HTTP_TIMEOUT", "30"))
+
+_service: Resource | None = None
+_service_lock = Lock()
+
+_pools: OrderedDict[int, "HttpPool"] = OrderedDict()
+_pools_lock = Lock()
+
+
+class HttpPool:
+    """
+    A small pool of authorized HTTP transports of a single user.
+
+    `httplib2.Http` is not thread-safe, so every concurrent request checks out
+    its own transport. Idle transports keep their connections open and are
+    reused by later requests of the same user.
+    """
+
+    def __init__(self, creds: PersistentCredentials):
+        self.creds = creds
+        self._idle: list[AuthorizedHttp] = []
+        self._lock = Lock()
+
+    def acquire(self) -> AuthorizedHttp:
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        return AuthorizedHttp(self.creds, http=httplib2.Http(timeout=HTTP_TIMEOUT))
+
+    def release(self, http: AuthorizedHttp):
+        with self._lock:
+            if len(self._idle) < HTTP_POOL_SIZE:
+                self._idle.append(http)
+                return
+        http.close()
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for http in idle:
+            http.close()
+
+
+def get_service() -> Resource:
+    """
+    Return the process-wide Google Calendar API service object.
+
+    The service is built once from the discovery document bundled with
+    google-api-python-client, so no discovery request is made. It is not bound
+    to any user: requests are executed with a user's transport from `execute`.
+
+    Return:
+        Resource: The Google Calendar v3 service.
+    """
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = build(
+                    "calendar",
+                    "v3",
+                    http=httplib2.Http(timeout=HTTP_TIMEOUT),
+                    static_discovery=True,
+                    cache_discovery=False,
+                )
+    return _service
+
+
+@contextmanager
+def authorized_http(user: TgUser) -> Iterator[AuthorizedHttp]:
+    """
+    Check out a pooled authorized HTTP transport of the user.
+
+    Pools are kept for at most `HTTP_POOL_MAX_USERS` users, evicting the least
+    recently used one. A pool is rebuilt when the credentials manager hands out
+    new credentials for the user, e.g. after logging in to Google again.
+
+    Args:
+        user (TgUser): The Telegram user whose Google credentials are used.
+
+    Return:
+        Iterator[AuthorizedHttp]: The transport, returned to the pool on exit.
+    """
+    creds = credentials_manager.get(user)
+    with _pools_lock:
+        pool = _pools.get(user.id)
+        if pool is None or pool.creds is not creds:
+            if pool is not None:
+                pool.close()
+            pool = _pools[user.id] = HttpPool(creds)
+        _pools.move_to_end(user.id)
+
+        evicted = []
+        while len(_pools) > HTTP_POOL_MAX_USERS:
+            evicted.append(_pools.popitem(last=False)[1])
+
+    for old in evicted:
+        old.close()
+
+    http = pool.acquire()
+    try:
+        yield http
+    finally:
+        pool.release(http)
+
+
+def execute(request: HttpRequest, user: TgUser) -> dict:
+    """
+    Execute a Google Calendar API request with the user's pooled transport.
+
+    Args:
+        request (HttpRequest): A request built from `get_service()`.
+        user (TgUser): The Telegram user on whose behalf the request is made.
+
+    Return:
+        dict: The decoded JSON response.
+
+    Raises:
+        HttpError: If the Google Calendar API returns an error status.
+    """
+    with authorized_http(user) as http:
+        return request.execute(http=http)
@@ -0,0 +1,94 @@
+import os
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from threading import Lock
+
+from google.auth import _helpers
+from google.auth.transport.requests import Request
+
+from shared.models.user import TgUser
+from sources.google_calendar.google_auth import PersistentCredentials, get_creds
+
+PROACTIVE_REFRESH_SECONDS = int(os.getenv("GOOGLE_PROACTIVE_REFRESH_SECONDS", "300"))
+CREDENTIALS_CACHE_SIZE = int(os.getenv("GOOGLE_CREDENTIALS_CACHE_SIZE", "1024"))
+
+
+class CredentialsManager:
+    """
+    In-process cache of Google credentials per user.
+
+    Credentials are built from the user record once and then reused, so a
+    refreshed access token (which `PersistentCredentials` also saves to the
+    database) is used by every later sync. Credentials that are about to
+    expire are refreshed in the background, at most once per user at a time.
+    """
+
+    def __init__(self, max_users: int = CREDENTIALS_CACHE_SIZE):
+        self._max_users = max_users
+        self._creds: OrderedDict[int, PersistentCredentials] = OrderedDict()
+        self._refreshing: set[int] = set()
+        self._lock = Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=2, thread_name_prefix="google-creds-refresh"
+        )
+
+    def get(self, user: TgUser) -> PersistentCredentials:
+        """
+        Return the cached credentials of the user, scheduling a refresh if needed.
+
+        The cache entry is rebuilt when the user's refresh token changes,
+        e.g. after logging in to Google again.
+
+        Args:
+            user (TgUser): The Telegram user whose credentials are requested.
+
+        Return:
+            PersistentCredentials: The user's credentials.
+        """
+        with self._lock:
+            creds = self._creds.get(user.id)
+            if creds is None or creds.refresh_token != user.google_refresh_token:
+                creds = self._creds[user.id] = get_creds(user)
+            self._creds.move_to_end(user.id)
+
+            while len(self._creds) > self._max_users:
+                self._creds.popitem(last=False)
+
+            if self._expires_soon(creds) and user.id not in self._refreshing:
+                self._refreshing.add(user.id)
+                self._executor.submit(self._refresh, user.id, creds)
+
+        return creds
+
+    def invalidate(self, user_id: int):
+        """
+        Drop the cached credentials of a user.
+
+        Args:
+            user_id (int): The unique identifier of the Telegram user.
+        """
+        with self._lock:
+            self._creds.pop(user_id, None)
+
+    def _refresh(self, user_id: int, creds: PersistentCredentials):
+        try:
+            if self._expires_soon(creds):
+                creds.refresh(Request())
+        except Exception as e:
+            print(f"Background token refresh failed for user {user_id}:", repr(e))
+        finally:
+            with self._lock:
+                self._refreshing.discard(user_id)
+
+    @staticmethod
+    def _expires_soon(creds: PersistentCredentials) -> bool:
+        if not creds.refresh_token:
+            return False
+        if creds.expiry is None:
+            return not creds.token
+        remaining = creds.expiry - _helpers.utcnow()
+        return remaining < timedelta(seconds=PROACTIVE_REFRESH_SECONDS)
+
+
+credentials_manager = CredentialsManager()
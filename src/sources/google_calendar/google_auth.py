@@ -1,11 +1,14 @@
 import json
 import os
+from threading import Lock
 
 from dotenv import load_dotenv
+from google.auth.transport import Request
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import Flow
 
 from shared.models.user import TgUser
+from shared.storage.users_repo import save_tokens
 
 load_dotenv()
 
@@ -40,6 +43,32 @@ def load_client_info() -> {str}:
 CLIENT_ID, CLIENT_SECRET, TOKEN_URI, AUTH_URI = load_client_info()
 
 
+class PersistentCredentials(Credentials):
+    """
+    Google OAuth2 credentials that write refreshed tokens back to the database.
+
+    Concurrent refreshes of the same credentials are collapsed: a thread that
+    waited for another thread's refresh reuses its result instead of making
+    another token request.
+    """
+
+    def __init__(self, *args, user_id: int = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.user_id = user_id
+        self._refresh_lock = Lock()
+
+    def refresh(self, request: Request):
+        stale_token = self.token
+        with self._refresh_lock:
+            if self.token != stale_token and self.valid:
+                return
+
+            super().refresh(request)
+
+            if self.user_id is not None:
+                save_tokens(self.user_id, self.token, self.refresh_token, self.expiry)
+
+
 def create_flow(state: str = None) -> Flow:
     """
     Create an OAuth2 Flow object for handling Google authentication.
@@ -112,26 +141,28 @@ def exchange_code_for_tokens(code: str, state: str) -> Credentials:
     return creds
 
 
-def get_creds(user: TgUser) -> Credentials:
+def get_creds(user: TgUser) -> PersistentCredentials:
     """
     Construct a Google Credentials object from a stored user record.
 
     This function takes user data saved in the database and converts it into a
     usable Credentials instance, including token expiry when available.
+    Refreshed tokens are saved back to the user record.
 
     Args:
         user (TgUser): The Telegram user whose stored OAuth tokens should be loaded.
 
     Return:
-        Credentials: A Google OAuth2 credentials object with access, refresh,
-            and expiry information.
+        PersistentCredentials: A Google OAuth2 credentials object with access,
+            refresh, and expiry information.
     """
-    creds = Credentials(
+    creds = PersistentCredentials(
         token=user.google_access_token,
         refresh_token=user.google_refresh_token,
         token_uri=TOKEN_URI,
         client_id=CLIENT_ID,
         client_secret=CLIENT_SECRET,
+        user_id=user.id,
     )
     if user.token_expiry:
         creds.expiry = user.token_expiry
@@ -1,27 +1,125 @@
 import os
-from datetime import datetime, timedelta
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from itertools import chain
+from threading import Lock
+from typing import Iterator
 
 from dateutil import parser
-from googleapiclient.discovery import build
-from sqlalchemy import delete, select
+from googleapiclient.errors import HttpError
+from sqlalchemy import delete
 
-from shared.mapper import map_events
+from shared.mapper import map_date_time, map_event_to_embedding, map_events
 from shared.models.calendar_event import CalendarEvent, Organizer
 from shared.models.embedding import Embedding
 from shared.models.user import TgUser
+from shared.nlp.embeddings import EMBEDDING_CACHE_KEY, text_hash
+from shared.pipeline import Prefetcher
+from shared.singleflight import SingleFlight
+from shared.storage.advisory_lock import advisory_lock
+from shared.storage.agenda_index import agenda_indexes, to_stored_time
+from shared.storage.calendar_version_repo import bump_calendar_versions
 from shared.storage.db import SessionLocal
-from sources.google_calendar.google_auth import get_creds
+from shared.storage.embedding_cache_repo import get_cached_vectors, save_cached_vectors
+from shared.storage.embeddings_repo import (
+    EventVersion,
+    copy_embeddings,
+    get_event_versions,
+    has_embeddings,
+    update_embedding_metadata,
+    upsert_embeddings,
+)
+from shared.storage.sync_state_repo import (
+    SyncState,
+    clear_other_sync_tokens,
+    clear_sync_token,
+    get_sync_state,
+    save_sync_token,
+)
+from shared.storage.users_repo import save_timezone
+from shared.storage.vector_index import vector_indexes
+from sources.google_calendar.client import execute, get_service
 
 CREDENTIALS_PATH = os.getenv("GOOGLE_CREDENTIALS")
+SYNC_WINDOW_DAYS = 180
+SYNC_PAGE_SIZE = int(os.getenv("SYNC_PAGE_SIZE", "250"))
+SYNC_PREFETCH_PAGES = int(os.getenv("SYNC_PREFETCH_PAGES", "2"))
+SYNC_CALENDAR_WORKERS = int(os.getenv("SYNC_CALENDAR_WORKERS", "4"))
+SYNC_COPY_MIN_ROWS = int(os.getenv("SYNC_COPY_MIN_ROWS", "100"))
+# progress steps of one calendar in the progress reported for a whole sync
+CALENDAR_PROGRESS_STEPS = 100
+
+sync_flights = SingleFlight()
+
+
+@dataclass
+class SyncResult:
+    inserted: int = 0
+    updated: int = 0
+    deleted: int = 0
+    seen_ids: set[str] = field(default_factory=set)
+    next_sync_token: str | None = None
 
 
 def load_all_events(user: TgUser, progress_callback: callable) -> tuple[int, int, int]:
     """
     Load all calendar events for a user and synchronize them with the database.
 
-    This function fetches events from the user's Google Calendar, maps them into
-    embedding objects, and then inserts, updates, or deletes records in the
-    database to reflect the current state of the calendar.
+    Only one sync per user runs at a time. A call that arrives while a sync of
+    the same user is running in this process waits for it and returns its
+    result instead of starting another run; progress is then reported only to
+    the caller that started it. Across processes, syncs of the same user are
+    serialized with a PostgreSQL advisory lock keyed by the user ID.
+
+    See `sync_user_calendars` for the synchronization itself.
+
+    Args:
+        user (TgUser): The Telegram user whose Google Calendar events should be synchronized.
+        progress_callback (callable, optional): Progress callback, see `sync_user_calendars`.
+
+    Return:
+        tuple[int, int, int]: A tuple containing the number of inserted, updated,
+            and deleted records in that order.
+    """
+    return sync_flights.do(user.id, run_locked_sync, user, progress_callback)
+
+
+def run_locked_sync(user: TgUser, progress_callback: callable) -> tuple[int, int, int]:
+    """
+    Synchronize the user's calendars while holding the user's advisory lock.
+
+    The user's in-memory vector and agenda indexes are dropped and the
+    calendar version is bumped afterwards, even if the sync failed part way,
+    since some of its pages may already be committed.
+
+    Args:
+        user (TgUser): The Telegram user whose calendars are synchronized.
+        progress_callback (callable, optional): Progress callback, see `sync_user_calendars`.
+
+    Return:
+        tuple[int, int, int]: The number of inserted, updated, and deleted records.
+    """
+    with advisory_lock(user.id):
+        try:
+            return sync_user_calendars(user, progress_callback)
+        finally:
+            vector_indexes.invalidate(user.id)
+            agenda_indexes.invalidate(user.id)
+            bump_calendar_versions([user.id])
+
+
+def sync_user_calendars(
+    user: TgUser, progress_callback: callable
+) -> tuple[int, int, int]:
+    """
+    Synchronize all calendars of a user with the database.
+
+    This function discovers the user's calendars through the calendarList API
+    and synchronizes them concurrently on a bounded thread pool, see
+    `load_calendar_events`. Rows are keyed by (calendar, event_id), and rows of
+    calendars that are no longer in the user's list are deleted. A failure of
+    one calendar is logged and does not affect the others.
 
     Args:
         user (TgUser): The Telegram user whose Google Calendar events should be synchronized.
@@ -36,71 +134,534 @@ def load_all_events(user: TgUser, progress_callback: callable) -> tuple[int, int
                 * current — number of processed items so far
                 * total   — total number of items to process
 
+            `total` stays the same for the whole sync: every calendar counts
+            as `CALENDAR_PROGRESS_STEPS` steps, of which it completes the
+            last one only when it is done, and `current` never decreases.
+            Within a calendar, pages are processed while later ones are still
+            being fetched, so its share is estimated from the pages fetched
+            so far.
+
             This can be used to update a loading indicator in a Telegram bot
             (for example, showing percentage of completion). If None, progress
             updates are not reported.
 
-
     Return:
         tuple[int, int, int]: A tuple containing the number of inserted, updated,
             and deleted records in that order.
+
+    Raises:
+        Exception: The error of the first failed calendar if none of the
+            calendars could be synchronized.
+    """
+    calendar_ids = fetch_calendar_ids(user)
+
+    progress: dict[str, int] = {}
+    progress_lock = Lock()
+
+    def report_progress(calendar_id: str, steps: int):
+        with progress_lock:
+            progress[calendar_id] = max(progress.get(calendar_id, 0), steps)
+            progress_callback(
+                sum(progress.values()), len(calendar_ids) * CALENDAR_PROGRESS_STEPS
+            )
+
+    def calendar_progress(calendar_id: str):
+        def on_step(current: int, total: int):
+            steps = current * CALENDAR_PROGRESS_STEPS // max(total, 1)
+            report_progress(calendar_id, min(steps, CALENDAR_PROGRESS_STEPS - 1))
+
+        return on_step if progress_callback else None
+
+    inserted = updated = deleted = 0
+    errors: list[Exception] = []
+    with ThreadPoolExecutor(max_workers=SYNC_CALENDAR_WORKERS) as pool:
+        futures = {
+            pool.submit(
+                load_calendar_events,
+                user,
+                calendar_progress(calendar_id),
+                calendar_id,
+            ): calendar_id
+            for calendar_id in calendar_ids
+        }
+        for future in as_completed(futures):
+            if progress_callback:
+                report_progress(futures[future], CALENDAR_PROGRESS_STEPS)
+            try:
+                ins, upd, dele = future.result()
+            except Exception as e:
+                print(f"Calendar {futures[future]} sync error:", repr(e))
+                errors.append(e)
+                continue
+            inserted += ins
+            updated += upd
+            deleted += dele
+
+    if errors and len(errors) == len(calendar_ids):
+        raise errors[0]
+
+    deleted += delete_removed_calendars(user, set(calendar_ids))
+
+    return inserted, updated, deleted
+
+
+def load_calendar_events(
+    user: TgUser, progress_callback: callable, calendar_id: str = "primary"
+) -> tuple[int, int, int]:
     """
-    events = fetch_events(user)
+    Synchronize a single calendar of a user with the database.
 
-    if not events:
-        raise ValueError("Календарь пуст или не удалось извлечь события")
+    When a sync token from a previous sync is stored, only the changes since
+    that sync are requested from Google. If Google rejects the token as expired
+    (HTTP 410), the token is dropped and a full sync is performed instead.
 
-    incoming_ids = {e.event_id for e in events}
+    Args:
+        user (TgUser): The Telegram user whose calendar is synchronized.
+        progress_callback (callable, optional): Progress callback, see `sync_user_calendars`.
+        calendar_id (str): The ID of the calendar to synchronize, default is "primary".
 
+    Return:
+        tuple[int, int, int]: The number of inserted, updated, and deleted records.
+    """
+    state = get_sync_state(user.id, calendar_id)
+    if state:
+        try:
+            return sync_changed_events(user, calendar_id, state, progress_callback)
+        except HttpError as e:
+            if e.resp.status != 410:
+                raise
+            print("Sync token expired, running full sync:", repr(e))
+            clear_sync_token(user.id, calendar_id)
+
+    return sync_all_events(user, calendar_id, progress_callback)
+
+
+def delete_removed_calendars(user: TgUser, calendar_ids: set[str]) -> int:
+    """
+    Delete the rows and sync tokens of calendars the user no longer has.
+
+    Args:
+        user (TgUser): The Telegram user whose calendars were synchronized.
+        calendar_ids (set[str]): IDs of the calendars currently in the user's list.
+
+    Return:
+        int: The number of deleted rows.
+    """
     with SessionLocal() as session:
-        existing_rows = session.scalars(
-            select(Embedding).where(Embedding.user_id == user.id)
-        ).all()
+        deleted = session.execute(
+            delete(Embedding).where(
+                Embedding.user_id == user.id,
+                Embedding.calendar_id.not_in(calendar_ids),
+            )
+        ).rowcount
+        session.commit()
 
-        existing_by_id = {row.event_id: row for row in existing_rows}
-        existing_ids = set(existing_by_id.keys())
+    clear_other_sync_tokens(user.id, calendar_ids)
+    return deleted
 
-        ids_to_insert = incoming_ids - existing_ids
-        ids_to_update: set[str] = set()
 
-        for event in events:
-            row = existing_by_id.get(event.event_id)
-            if not row:
-                continue
+def sync_all_events(
+    user: TgUser, calendar_id: str, progress_callback: callable
+) -> tuple[int, int, int]:
+    """
+    Synchronize the whole sync window of a calendar with the database.
+
+    Every stored event of the user that is no longer returned by Google is
+    deleted. An empty calendar (e.g. an unused shared calendar) is a valid
+    result: its stored events are all deleted. The sync token returned with
+    the listing is saved so that the next sync can be incremental.
+
+    Args:
+        user (TgUser): The Telegram user whose calendar is synchronized.
+        calendar_id (str): The ID of the calendar to synchronize.
+        progress_callback (callable, optional): Progress callback, see `sync_user_calendars`.
+
+    Return:
+        tuple[int, int, int]: The number of inserted, updated, and deleted records.
+    """
+    time_min, time_max = get_sync_window()
+    result = sync_pages(
+        user,
+        calendar_id,
+        fetch_events(
+            user, calendar_id=calendar_id, time_min=time_min, time_max=time_max
+        ),
+        progress_callback,
+        first_sync=not has_embeddings(user, calendar_id),
+    )
+
+    with SessionLocal() as session:
+        result.deleted += session.execute(
+            delete(Embedding).where(
+                Embedding.user_id == user.id,
+                Embedding.calendar_id == calendar_id,
+                Embedding.event_id.not_in(result.seen_ids),
+            )
+        ).rowcount
+        session.commit()
+
+    if result.next_sync_token:
+        save_sync_token(user.id, calendar_id, result.next_sync_token, time_max)
+
+    return result.inserted, result.updated, result.deleted
+
+
+def sync_changed_events(
+    user: TgUser, calendar_id: str, state: SyncState, progress_callback: callable
+) -> tuple[int, int, int]:
+    """
+    Synchronize only the events that changed since the previous sync.
+
+    Cancelled events and events that moved out of the sync window are deleted,
+    everything else is inserted or updated. Events that have already ended are
+    dropped as well, just like a full sync would do. Only the stored rows of
+    the changed events are loaded from the database.
+
+    The sync token only reports changed events, so unchanged events that
+    entered the sync window since the previous sync, which moves with the
+    current time, are listed separately: the range between the window end
+    saved with the token and the current window end is fetched first.
+
+    Args:
+        user (TgUser): The Telegram user whose calendar is synchronized.
+        calendar_id (str): The ID of the calendar to synchronize.
+        state (SyncState): The sync token and window end saved after the previous sync.
+        progress_callback (callable, optional): Progress callback, see `sync_user_calendars`.
+
+    Return:
+        tuple[int, int, int]: The number of inserted, updated, and deleted records.
+
+    Raises:
+        HttpError: If the Google Calendar API rejects the request, e.g. with
+            status 410 when the sync token has expired.
+    """
+    time_min, time_max = get_sync_window()
+    exposed_from = max(state.window_end or time_min, time_min)
+    # the changes come last, so they win over the listing of the exposed range
+    pages = chain(
+        (
+            (events, None)
+            for events, _ in fetch_events(
+                user, calendar_id=calendar_id, time_min=exposed_from, time_max=time_max
+            )
+        ),
+        fetch_events(user, calendar_id=calendar_id, sync_token=state.sync_token),
+    )
+    result = sync_pages(
+        user,
+        calendar_id,
+        pages,
+        progress_callback,
+        window=(time_min, time_max),
+    )
+
+    # unchanged events that already ended are not reported by Google
+    with SessionLocal() as session:
+        result.deleted += session.execute(
+            delete(Embedding).where(
+                Embedding.user_id == user.id,
+                Embedding.calendar_id == calendar_id,
+                Embedding.end_ts < time_min,
+            )
+        ).rowcount
+        session.commit()
+
+    if result.next_sync_token:
+        save_sync_token(user.id, calendar_id, result.next_sync_token, time_max)
+
+    return result.inserted, result.updated, result.deleted
+
+
+def sync_pages(
+    user: TgUser,
+    calendar_id: str,
+    pages: Iterator[tuple[list[CalendarEvent], str | None]],
+    progress_callback: callable,
+    window: tuple[datetime, datetime] | None = None,
+    first_sync: bool = False,
+) -> SyncResult:
+    """
+    Run the fetch → embed → write pipeline over pages of calendar events.
+
+    The next page is fetched in the background while the current one is
+    embedded, and each embedded page is written to the database in its own
+    transaction while the following page is embedded. At most
+    `SYNC_PREFETCH_PAGES` fetched pages and one pending write are held at a
+    time, so memory does not depend on the size of the calendar.
+
+    Args:
+        user (TgUser): The Telegram user who owns the events.
+        calendar_id (str): The ID of the calendar the pages belong to.
+        pages (Iterator): Pages of events with the sync token of the last page.
+        progress_callback (callable, optional): Progress callback, see `sync_user_calendars`.
+        window (tuple[datetime, datetime], optional): If given, events outside
+            this range are treated as removed.
+        first_sync (bool): Whether the calendar has no stored rows yet, which
+            allows loading new rows with `COPY`.
+
+    Return:
+        SyncResult: Counters, the IDs of all seen events and the next sync token.
+    """
+    result = SyncResult()
+    fetched = 0
+    processed = 0
+
+    def counted(source):
+        nonlocal fetched
+        for page in source:
+            fetched += len(page[0])
+            yield page
+
+    def add_counts(future: Future):
+        inserted, updated, deleted = future.result()
+        result.inserted += inserted
+        result.updated += updated
+        result.deleted += deleted
+
+    pending: Future | None = None
+    with ThreadPoolExecutor(max_workers=1) as writer:
+        for events, next_sync_token in Prefetcher(counted(pages), SYNC_PREFETCH_PAGES):
+            page_ids = {e.event_id for e in events}
+            result.seen_ids |= page_ids
+            result.next_sync_token = next_sync_token or result.next_sync_token
+
+            keep = [
+                e
+                for e in events
+                if not e.cancelled and (window is None or is_in_window(e, *window))
+            ]
+            versions = get_event_versions(user, calendar_id, page_ids)
+            ids_to_delete = (page_ids - {e.event_id for e in keep}) & set(versions)
+
+            def on_step(current: int, total: int, done: int = processed):
+                progress_callback(
+                    done + current * len(events) // total, max(fetched, 1)
+                )
+
+            to_insert, to_update, to_touch = embed_changed_events(
+                user,
+                calendar_id,
+                keep,
+                versions,
+                on_step if progress_callback else None,
+            )
+            processed += len(events)
+            if progress_callback:
+                progress_callback(processed, max(fetched, 1))
+
+            if pending:
+                add_counts(pending)
+            pending = writer.submit(
+                write_events,
+                user,
+                calendar_id,
+                to_insert,
+                to_update,
+                to_touch,
+                ids_to_delete,
+                first_sync,
+            )
+
+        if pending:
+            add_counts(pending)
+
+    return result
+
+
+def embed_changed_events(
+    user: TgUser,
+    calendar_id: str,
+    events: [CalendarEvent],
+    versions: dict[str, EventVersion],
+    progress_callback: callable,
+) -> tuple[list[Embedding], list[Embedding], list[Embedding]]:
+    """
+    Embed the new and changed events of a page.
 
-            if row.updated is None or event.updated is None:
-                ids_to_update.add(event.event_id)
-            elif event.updated > row.updated:
-                ids_to_update.add(event.event_id)
+    Changed events whose embedded text is the same as stored (e.g. after an
+    RSVP or reminder edit) are not embedded again: they are returned as
+    metadata-only rows without a vector.
 
-        ids_to_delete = existing_ids - incoming_ids
+    Args:
+        user (TgUser): The Telegram user who owns the events.
+        calendar_id (str): The ID of the calendar the events belong to.
+        events (list[CalendarEvent]): Incoming events that should be stored.
+        versions (dict[str, EventVersion]): Versions of the stored events
+            keyed by event ID.
+        progress_callback (callable, optional): Progress callback passed to `map_events`.
+
+    Return:
+        tuple[list[Embedding], list[Embedding], list[Embedding]]: Rows to
+            insert, rows to update, and rows whose metadata only is updated.
+    """
+    ids_to_insert = {e.event_id for e in events} - versions.keys()
+    ids_to_update: set[str] = set()
+    to_touch: list[Embedding] = []
+
+    for event in events:
+        row = versions.get(event.event_id)
+        if not row:
+            continue
+
+        if not (
+            row.updated is None or event.updated is None or event.updated > row.updated
+        ):
+            continue
+        if row.content_hash and row.content_hash == text_hash(event.to_str()):
+            to_touch.append(map_event_to_embedding(user, event, None))
+        else:
+            ids_to_update.add(event.event_id)
+
+    ids_need_mapping = ids_to_insert | ids_to_update
+    events_to_map = [e for e in events if e.event_id in ids_need_mapping]
+    if not events_to_map:
+        return [], [], to_touch
+
+    known_vectors = get_cached_vectors(
+        EMBEDDING_CACHE_KEY, {text_hash(event.to_str()) for event in events_to_map}
+    )
+    batch = map_events(
+        user,
+        events_to_map,
+        progress_callback=progress_callback,
+        known_vectors=known_vectors,
+    )
+    save_cached_vectors(
+        EMBEDDING_CACHE_KEY,
+        {
+            row.content_hash: row.message
+            for row in batch
+            if row.content_hash not in known_vectors
+        },
+    )
 
-        ids_need_mapping = ids_to_insert | ids_to_update
-        events_to_map = [e for e in events if e.event_id in ids_need_mapping]
+    to_insert = [row for row in batch if row.event_id in ids_to_insert]
+    to_update = [row for row in batch if row.event_id in ids_to_update]
+    return to_insert, to_update, to_touch
 
-        batch = map_events(user, events_to_map, progress_callback=progress_callback)
 
-        to_insert = [row for row in batch if row.event_id in ids_to_insert]
-        to_update = [row for row in batch if row.event_id in ids_to_update]
+def write_events(
+    user: TgUser,
+    calendar_id: str,
+    to_insert: list[Embedding],
+    to_update: list[Embedding],
+    to_touch: list[Embedding],
+    ids_to_delete: set[str],
+    first_sync: bool = False,
+) -> tuple[int, int, int]:
+    """
+    Write one chunk of the sync diff to the database in its own transaction.
 
-        if to_insert:
-            session.add_all(to_insert)
+    Rows are written with batched upserts. During the first sync of a calendar,
+    large chunks of new rows are loaded with `COPY` instead. Rows whose text
+    did not change only get their metadata updated.
 
-        if to_update:
-            for row in to_update:
-                session.merge(row)
+    Args:
+        user (TgUser): The Telegram user who owns the events.
+        calendar_id (str): The ID of the calendar the events belong to.
+        to_insert (list[Embedding]): New rows.
+        to_update (list[Embedding]): Rows of changed events.
+        to_touch (list[Embedding]): Rows of events whose text did not change.
+        ids_to_delete (set[str]): Event IDs whose rows should be removed.
+        first_sync (bool): Whether the calendar had no stored rows before the sync.
+
+    Return:
+        tuple[int, int, int]: The number of inserted, updated, and deleted records.
+    """
+    with SessionLocal() as session:
+        if first_sync and len(to_insert) >= SYNC_COPY_MIN_ROWS:
+            copy_embeddings(session, to_insert)
+            upsert_embeddings(session, to_update)
+        else:
+            upsert_embeddings(session, to_insert + to_update)
+        update_embedding_metadata(session, to_touch)
 
         if ids_to_delete:
             session.execute(
                 delete(Embedding).where(
                     Embedding.user_id == user.id,
+                    Embedding.calendar_id == calendar_id,
                     Embedding.event_id.in_(ids_to_delete),
                 )
             )
 
         session.commit()
 
-    return len(to_insert), len(to_update), len(ids_to_delete)
+    return len(to_insert), len(to_update) + len(to_touch), len(ids_to_delete)
+
+
+def get_sync_window() -> tuple[datetime, datetime]:
+    """
+    Return the time range of events that are kept in the database.
+
+    The bounds are naive UTC, like the stored start and end times.
+
+    Return:
+        tuple[datetime, datetime]: The start (now) and the end
+            (`SYNC_WINDOW_DAYS` from now) of the sync window.
+    """
+    now = to_stored_time(datetime.now(timezone.utc))
+    return now, now + timedelta(days=SYNC_WINDOW_DAYS)
+
+
+def is_in_window(event: CalendarEvent, time_min: datetime, time_max: datetime) -> bool:
+    """
+    Check whether an event overlaps the given time range.
+
+    Mirrors the filtering Google applies for `timeMin`/`timeMax`: the event
+    must end after `time_min` and start before `time_max`.
+
+    Args:
+        event (CalendarEvent): The event to check.
+        time_min (datetime): The naive UTC start of the range.
+        time_max (datetime): The naive UTC end of the range.
+
+    Return:
+        bool: True if the event overlaps the range.
+    """
+    start = map_date_time(event.start_ts or {})
+    end = map_date_time(event.end_ts or {}) or start
+    if start is None:
+        return False
+
+    start, end = to_stored_time(start), to_stored_time(end)
+    return end > time_min and start < time_max
+
+
+def fetch_calendar_ids(user: TgUser) -> list[str]:
+    """
+    Fetch the IDs of all calendars in the user's calendar list.
+
+    The user's primary calendar is returned as "primary", so its rows and sync
+    token stay the same as before multi-calendar sync. Its time zone is saved
+    as the user's time zone when it changes, see `user_timezone`.
+
+    Args:
+        user (TgUser): The Telegram user whose calendar list should be queried.
+
+    Return:
+        list[str]: IDs of the visible calendars of the user.
+    """
+    service = get_service()
+
+    calendar_ids = []
+    params = {}
+    while True:
+        result = execute(service.calendarList().list(**params), user)
+        for item in result.get("items", []):
+            calendar_ids.append("primary" if item.get("primary") else item["id"])
+            timezone = item.get("timeZone")
+            if item.get("primary") and timezone and timezone != user.timezone:
+                save_timezone(user.id, timezone)
+
+        page_token = result.get("nextPageToken")
+        if not page_token:
+            break
+        params["pageToken"] = page_token
+
+    if "primary" not in calendar_ids:
+        calendar_ids.insert(0, "primary")
+    return calendar_ids
 
 
 def fetch_events(
@@ -108,67 +669,94 @@ def fetch_events(
     calendar_id: str = "primary",
     time_min: datetime = None,
     time_max: datetime = None,
-    max_results: int = 2500,
-) -> [CalendarEvent]:
+    max_results: int = SYNC_PAGE_SIZE,
+    sync_token: str = None,
+) -> Iterator[tuple[list[CalendarEvent], str | None]]:
     """
-    Fetch events from a user's Google Calendar within a given time range.
+    Fetch events from a user's Google Calendar page by page.
 
     This function calls the Google Calendar API using the user's credentials and
-    yields CalendarEvent objects for each event found in the specified calendar
-    and time window.
+    yields CalendarEvent objects for each page of events found in the specified
+    calendar and time window, following `nextPageToken` until the listing is
+    complete. When a sync token is given, only the events changed since the sync
+    that produced the token are returned, including cancelled ones.
 
     Args:
         user (TgUser): The Telegram user whose Google Calendar should be queried.
         calendar_id (str): The ID of the calendar to fetch events from, default is "primary".
         time_min (datetime): The start of the time range to query. If None, uses the current UTC time.
         time_max (datetime): The end of the time range to query. If None, uses 180 days from now.
-        max_results (int): The maximum number of events to return from the API.
+        max_results (int): The maximum number of events per API page.
+        sync_token (str): The sync token of a previous sync. Google does not allow
+            combining it with a time range, so `time_min` and `time_max` are ignored.
 
     Return:
-        list[CalendarEvent]: A list of CalendarEvent objects representing the events
-            retrieved from the Google Calendar API.
-    """
-    creds = get_creds(user)
-    service = build("calendar", "v3", credentials=creds)
-
-    if time_min is None:
-        time_min = datetime.now() - timedelta(days=0)
-    if time_max is None:
-        time_max = datetime.now() + timedelta(days=180)
-
-    events_result = (
-        service.events()
-        .list(
-            calendarId=calendar_id,
-            timeMin=time_min.isoformat() + "Z",
-            timeMax=time_max.isoformat() + "Z",
-            singleEvents=True,
-            orderBy="startTime",
-            maxResults=max_results,
-        )
-        .execute()
-    )
+        Iterator[tuple[list[CalendarEvent], str | None]]: Pages of events, each with
+            the `nextSyncToken` for the next incremental sync (only set on the last page).
 
-    return [
-        CalendarEvent(
-            event_id=item.get("id"),
-            calendar=calendar_id,
-            title=item.get("summary"),
-            description=item.get("description"),
-            location=item.get("location"),
-            participants=[
-                a.get("email") or a.get("displayName") or ""
-                for a in item.get("attendees", [])
-            ],
-            start_ts=item.get("start"),
-            end_ts=item.get("end"),
-            updated=parser.isoparse(item.get("updated")),
-            organizer=Organizer(
-                id=item.get("organizer", {}).get("id"),
-                email=item.get("organizer", {}).get("email"),
-                displayName=item.get("organizer", {}).get("displayName"),
-                self=item.get("organizer", {}).get("self"),
-            ),
-        )
-        for item in events_result.get("items", [])
-    ]
+    Raises:
+        HttpError: If the Google Calendar API rejects the request, e.g. with
+            status 410 when the sync token has expired.
+    """
+    service = get_service()
+
+    params = {
+        "calendarId": calendar_id,
+        "singleEvents": True,
+        "maxResults": max_results,
+    }
+    if sync_token:
+        params["syncToken"] = sync_token
+    else:
+        window_min, window_max = get_sync_window()
+        params["timeMin"] = (time_min or window_min).isoformat() + "Z"
+        params["timeMax"] = (time_max or window_max).isoformat() + "Z"
+
+    while True:
+        events_result = execute(service.events().list(**params), user)
+        events = [
+            map_item_to_event(item, calendar_id)
+            for item in events_result.get("items", [])
+        ]
+        yield events, events_result.get("nextSyncToken")
+
+        page_token = events_result.get("nextPageToken")
+        if not page_token:
+            return
+        params["pageToken"] = page_token
+
+
+def map_item_to_event(item: dict, calendar_id: str) -> CalendarEvent:
+    """
+    Convert a Google Calendar API event resource into a CalendarEvent.
+
+    Args:
+        item (dict): The event resource returned by the Google Calendar API.
+        calendar_id (str): The ID of the calendar the event belongs to.
+
+    Return:
+        CalendarEvent: The mapped event. Cancelled events returned by an
+            incremental sync may carry only their ID and `cancelled=True`.
+    """
+    updated = item.get("updated")
+    return CalendarEvent(
+        event_id=item.get("id"),
+        calendar=calendar_id,
+        title=item.get("summary"),
+        description=item.get("description"),
+        location=item.get("location"),
+        participants=[
+            a.get("email") or a.get("displayName") or ""
+            for a in item.get("attendees", [])
+        ],
+        start_ts=item.get("start"),
+        end_ts=item.get("end"),
+        updated=parser.isoparse(updated) if updated else None,
+        organizer=Organizer(
+            id=item.get("organizer", {}).get("id"),
+            email=item.get("organizer", {}).get("email"),
+            displayName=item.get("organizer", {}).get("displayName"),
+            self=item.get("organizer", {}).get("self"),
+        ),
+        cancelled=item.get("status") == "cancelled",
+    )